@@ -0,0 +1,193 @@
+import asyncio
+import itertools
+import re
+from typing import Any, Dict, List, Optional
+
+from capyswarm.act import act
+
+TINY_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+WORKER_TOOLS = ["bash", "computer", "str_replace_editor"]
+
+
+class FakeBrowser:
+    async def stop(self) -> None:
+        return None
+
+
+class FakeInstance:
+    """An instance whose tools return canned results after a fixed latency"""
+
+    def __init__(self, id: str, instance_type: str, tool_latency: float):
+        self.id = id
+        self.instance_type = instance_type
+        self.tool_latency = tool_latency
+        self.status = "running"
+        self.browser = FakeBrowser()
+
+    async def bash(self, command: Optional[str] = None, restart: bool = False):
+        await asyncio.sleep(self.tool_latency)
+        return {"output": f"$ {command}\nok", "error": ""}
+
+    async def computer(self, action: str, **kwargs: Any):
+        await asyncio.sleep(self.tool_latency)
+        return {"output": "", "base64_image": TINY_PNG}
+
+    async def edit(self, command: str, path: str, **kwargs: Any):
+        await asyncio.sleep(self.tool_latency)
+        return {"output": f"{command} {path}: ok"}
+
+    async def get_stream_url(self):
+        return None
+
+    async def stop(self) -> None:
+        self.status = "terminated"
+
+
+class _FakeResponse:
+    def __init__(self, body: Dict[str, Any]):
+        self.status_code = 200
+        self._body = body
+
+    def json(self) -> Dict[str, Any]:
+        return self._body
+
+
+class _FakeHttpClient:
+    def __init__(self, client: "FakeScrapybara"):
+        self._client = client
+
+    async def request(self, path: str, method: str = "POST", json=None, **kwargs):
+        return _FakeResponse(await self._client.respond(json))
+
+
+class FakeScrapybara:
+    """Stands in for `AsyncScrapybara`, with a scripted model and fake instances.
+
+    Serves `v1/act` requests (through `httpx_client`, like the real client) with
+    scripted replies:
+    - The orchestrator returns `plan` when asked for a plan, no assignments when asked
+      to reassign, and one reply per agent to batched mailbox messages
+    - Each worker makes `tool_calls` calls, cycling through bash, computer and edit and
+      calling communicate every `communicate_every` calls, then reports back
+
+    Args:
+        plan (Dict[str, Any]): OrchestratorSchema returned for the initial plan
+        tool_calls (int): Tool calls per worker task
+        communicate_every (int): Call communicate every N tool calls, never if 0
+        llm_latency (float): Seconds per act request
+        tool_latency (float): Seconds per bash/computer/edit call
+        start_latency (float): Seconds to start an instance
+    """
+
+    def __init__(
+        self,
+        plan: Dict[str, Any],
+        tool_calls: int = 3,
+        communicate_every: int = 0,
+        llm_latency: float = 0.0,
+        tool_latency: float = 0.0,
+        start_latency: float = 0.0,
+    ):
+        self.plan = plan
+        self.tool_calls = tool_calls
+        self.communicate_every = communicate_every
+        self.llm_latency = llm_latency
+        self.tool_latency = tool_latency
+        self.start_latency = start_latency
+        self.httpx_client = _FakeHttpClient(self)
+        self.instances: Dict[str, FakeInstance] = {}
+        self.requests = 0
+        self._ids = itertools.count()
+        self._calls = itertools.count()
+
+    async def _start(self, instance_type: str) -> FakeInstance:
+        await asyncio.sleep(self.start_latency)
+        instance = FakeInstance(
+            f"fake-{next(self._ids)}", instance_type, self.tool_latency
+        )
+        self.instances[instance.id] = instance
+        return instance
+
+    async def start_ubuntu(self, **kwargs: Any) -> FakeInstance:
+        return await self._start("ubuntu")
+
+    async def start_browser(self, **kwargs: Any) -> FakeInstance:
+        return await self._start("browser")
+
+    async def start_windows(self, **kwargs: Any) -> FakeInstance:
+        return await self._start("windows")
+
+    async def get_instances(self, **kwargs: Any) -> List[FakeInstance]:
+        return [i for i in self.instances.values() if i.status == "running"]
+
+    async def act(self, **kwargs: Any):
+        return await act(self, **kwargs)
+
+    def _call(self, name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "tool-call",
+            "tool_call_id": f"call-{next(self._calls)}",
+            "tool_name": name,
+            "args": args,
+        }
+
+    def _worker_call(self, n: int) -> Dict[str, Any]:
+        if self.communicate_every and (n + 1) % self.communicate_every == 0:
+            return self._call("communicate", {"message": f"Progress after {n} calls"})
+        match WORKER_TOOLS[n % len(WORKER_TOOLS)]:
+            case "bash":
+                return self._call("bash", {"command": f"echo {n}"})
+            case "computer":
+                return self._call("computer", {"action": "screenshot"})
+            case _:
+                return self._call(
+                    "str_replace_editor", {"command": "view", "path": f"/tmp/{n}"}
+                )
+
+    def _script(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        messages = request["messages"]
+        tools = {tool["name"]: tool for tool in request.get("tools", [])}
+        last = messages[-1]
+        texts = [p.get("text", "") for p in last["content"] if p.get("type") == "text"]
+
+        if "structured_output" in tools:
+            properties = tools["structured_output"]["parameters"].get("properties", {})
+            if "replies" in properties:
+                names = [m.group(1) for t in texts if (m := re.match(r"\[(.+?)\] ", t))]
+                output = {
+                    "replies": [{"agent_name": n, "message": "ok"} for n in names]
+                }
+            elif any("did not complete" in t for t in texts):
+                output = {**self.plan, "task_assignments": []}
+            else:
+                output = self.plan
+            return [self._call("structured_output", output)]
+
+        if "communicate" in tools:
+            # Tool calls made since the latest assignment
+            n = 0
+            for message in reversed(messages):
+                if message["role"] == "user":
+                    break
+                n += message["role"] == "assistant"
+            if n < self.tool_calls:
+                return [{"type": "text", "text": ""}, self._worker_call(n)]
+            return [{"type": "text", "text": "Task complete"}]
+
+        return [{"type": "text", "text": "Report: all tasks complete"}]
+
+    async def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.requests += 1
+        await asyncio.sleep(self.llm_latency)
+        content = self._script(request)
+        calls = any(part["type"] == "tool-call" for part in content)
+        prompt_tokens = 50 * len(request["messages"])
+        return {
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "tool-calls" if calls else "stop",
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": 20,
+                "total_tokens": prompt_tokens + 20,
+            },
+        }
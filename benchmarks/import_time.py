@@ -0,0 +1,104 @@
+"""Measures how long importing capyswarm takes in a fresh interpreter.
+
+Each statement runs in a new process so nothing is cached between runs, which is what
+a CLI invocation or a serverless cold start pays.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --save imports.json
+    python -m benchmarks.import_time --baseline imports.json --tolerance 0.2
+    python -X importtime -c "import capyswarm"   # per-module breakdown
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+from .run import percentile
+
+STATEMENTS = [
+    "import capyswarm",
+    "from capyswarm import Agent",
+    "from capyswarm import SwarmInstancePool",
+    "from capyswarm import Swarm",
+    "from capyswarm import SwarmJobRunner",
+]
+
+TIMER = """
+import time
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started)
+"""
+
+
+def measure(statement: str, repeat: int) -> List[float]:
+    """Seconds the statement takes in each of `repeat` fresh interpreters"""
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMER.format(statement=statement)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        times.append(float(output))
+    return times
+
+
+def regressions(
+    results: List[Dict[str, float]], baseline: List[Dict[str, float]], tolerance: float
+) -> List[str]:
+    """Statements whose median import time grew by more than `tolerance`"""
+    previous = {r["statement"]: r for r in baseline}
+    found = []
+    for r in results:
+        before = previous.get(r["statement"])
+        if before and r["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            found.append(
+                f"{r['statement']}: {r['p50_ms']:.1f}ms, was {before['p50_ms']:.1f}ms"
+            )
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per statement")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed growth in median import time before it counts as a regression",
+    )
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'statement':<44}{'p50':>10}{'p99':>10}")
+    for statement in STATEMENTS:
+        times = measure(statement, args.repeat)
+        result = {
+            "statement": statement,
+            "p50_ms": percentile(times, 50) * 1000,
+            "p99_ms": percentile(times, 99) * 1000,
+        }
+        print(f"{statement:<44}{result['p50_ms']:>8.1f}ms{result['p99_ms']:>8.1f}ms")
+        results.append(result)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        if found:
+            print("\nRegressions:\n" + "\n".join(found))
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
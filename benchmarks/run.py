@@ -0,0 +1,254 @@
+"""Offline benchmarks of capyswarm's orchestration overhead.
+
+Runs scenarios against `FakeScrapybara`, so no instances are started and no model is
+called. With the default zero latencies, everything measured is capyswarm itself:
+scheduling, tool dispatch, history handling and the mailbox.
+
+    python -m benchmarks.run                        # every sweep
+    python -m benchmarks.run --sweep agents         # one sweep
+    python -m benchmarks.run --save baseline.json   # record results
+    python -m benchmarks.run --baseline baseline.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from pydantic import BaseModel
+from scrapybara.types.act import (
+    AssistantMessage,
+    Message,
+    TextPart,
+    ToolCallPart,
+    ToolMessage,
+    ToolResultPart,
+    UserMessage,
+)
+
+from capyswarm import Agent, Swarm, SwarmInstancePool
+from capyswarm.sinks import NullSink
+
+from .fake import FakeScrapybara
+
+
+class Scenario(BaseModel):
+    """One benchmark configuration
+
+    Attributes:
+        agents (int): Number of worker agents, each gets one assignment
+        priority_depth (int): Number of priority levels the assignments are spread over
+        tool_calls (int): Tool calls per assignment
+        communicate_every (int): Workers message the orchestrator every N tool calls
+        history (int): Turns of prior history each worker starts with
+        llm_latency (float): Simulated seconds per act request
+        tool_latency (float): Simulated seconds per tool call
+        repeat (int): Number of runs
+    """
+
+    agents: int = 4
+    priority_depth: int = 1
+    tool_calls: int = 3
+    communicate_every: int = 0
+    history: int = 0
+    llm_latency: float = 0.0
+    tool_latency: float = 0.0
+    repeat: int = 5
+
+    @property
+    def name(self) -> str:
+        return (
+            f"agents={self.agents} depth={self.priority_depth} "
+            f"communicate={self.communicate_every} history={self.history}"
+        )
+
+
+SWEEPS: Dict[str, List[Scenario]] = {
+    "agents": [Scenario(agents=n) for n in (1, 4, 16, 64)],
+    "priority_depth": [Scenario(agents=8, priority_depth=d) for d in (1, 2, 4, 8)],
+    "communicate_every": [
+        Scenario(agents=8, tool_calls=4, communicate_every=n) for n in (0, 4, 2, 1)
+    ],
+    "history": [Scenario(history=n) for n in (0, 100, 500, 2000)],
+}
+
+
+def make_plan(scenario: Scenario) -> Dict[str, Any]:
+    depth = max(1, min(scenario.priority_depth, scenario.agents))
+    return {
+        "overall_task": "Benchmark",
+        "execution_notes": "",
+        "task_assignments": [
+            {
+                "agent_name": f"Worker {i}",
+                "prompt": f"Task {i}",
+                # Spread over `depth` levels, each level waits for the one above
+                "priority": depth - i * depth // scenario.agents,
+            }
+            for i in range(scenario.agents)
+        ],
+    }
+
+
+def make_history(turns: int) -> List[Message]:
+    history: List[Message] = [UserMessage(content=[TextPart(text="Earlier task")])]
+    for i in range(turns):
+        call = ToolCallPart(
+            tool_call_id=f"h{i}", tool_name="bash", args={"command": f"ls {i}"}
+        )
+        history.append(AssistantMessage(content=[TextPart(text=f"Step {i}"), call]))
+        history.append(
+            ToolMessage(
+                content=[
+                    ToolResultPart(
+                        tool_call_id=f"h{i}", tool_name="bash", result={"output": "x"}
+                    )
+                ]
+            )
+        )
+    history.append(AssistantMessage(content=[TextPart(text="Earlier task done")]))
+    return history
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+
+
+async def run_scenario(scenario: Scenario) -> Dict[str, Any]:
+    client = FakeScrapybara(
+        make_plan(scenario),
+        tool_calls=scenario.tool_calls,
+        communicate_every=scenario.communicate_every,
+        llm_latency=scenario.llm_latency,
+        tool_latency=scenario.tool_latency,
+    )
+    pool = SwarmInstancePool(client=client)
+    run_times: List[float] = []
+    task_times: List[float] = []
+    steps = 0
+
+    for _ in range(scenario.repeat):
+        workers = [
+            Agent(
+                name=f"Worker {i}",
+                prompt="You are a benchmark worker.",
+                step_sink=NullSink(),
+                messages=make_history(scenario.history) if scenario.history else None,
+            )
+            for i in range(scenario.agents)
+        ]
+        orchestrator = Agent(name="Orchestrator", orchestrator=True, step_sink=None)
+        started_tasks: Dict[str, float] = {}
+        async with Swarm(workers + [orchestrator], pool=pool) as swarm:
+            started = time.perf_counter()
+            async for event in swarm.stream("Run the benchmark"):
+                match event.type:
+                    case "step":
+                        steps += 1
+                    case "task_started":
+                        started_tasks[event.task_id] = time.perf_counter()
+                    case "task_finished":
+                        task_id = event.result.task_id
+                        if task_id in started_tasks:
+                            task_times.append(
+                                time.perf_counter() - started_tasks[task_id]
+                            )
+            run_times.append(time.perf_counter() - started)
+    await pool.close()
+
+    total = sum(run_times)
+    return {
+        "scenario": scenario.name,
+        "runs_per_s": scenario.repeat / total,
+        "steps_per_s": steps / total,
+        "requests": client.requests,
+        "run_p50_ms": percentile(run_times, 50) * 1000,
+        "run_p99_ms": percentile(run_times, 99) * 1000,
+        "task_p50_ms": percentile(task_times, 50) * 1000,
+        "task_p99_ms": percentile(task_times, 99) * 1000,
+    }
+
+
+def render(results: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'scenario':<52}{'runs/s':>9}{'steps/s':>10}"
+        f"{'run p50':>10}{'run p99':>10}{'task p50':>10}{'task p99':>10}"
+    ]
+    for r in results:
+        lines.append(
+            f"{r['scenario']:<52}{r['runs_per_s']:>9.1f}{r['steps_per_s']:>10.0f}"
+            f"{r['run_p50_ms']:>8.1f}ms{r['run_p99_ms']:>8.1f}ms"
+            f"{r['task_p50_ms']:>8.1f}ms{r['task_p99_ms']:>8.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+def regressions(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """Scenarios whose throughput dropped by more than `tolerance` from the baseline"""
+    previous = {r["scenario"]: r for r in baseline}
+    found = []
+    for r in results:
+        before = previous.get(r["scenario"])
+        if before and r["steps_per_s"] < before["steps_per_s"] * (1 - tolerance):
+            found.append(
+                f"{r['scenario']}: {r['steps_per_s']:.0f} steps/s, "
+                f"was {before['steps_per_s']:.0f}"
+            )
+    return found
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sweep", choices=["all", *SWEEPS], default="all")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--tool-latency", type=float, default=0.0)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed drop in steps/s before a scenario counts as a regression",
+    )
+    args = parser.parse_args()
+
+    sweeps = SWEEPS if args.sweep == "all" else {args.sweep: SWEEPS[args.sweep]}
+    results = []
+    for sweep, scenarios in sweeps.items():
+        print(f"\n{sweep}")
+        sweep_results = []
+        for scenario in scenarios:
+            scenario = scenario.model_copy(
+                update={
+                    "repeat": args.repeat,
+                    "llm_latency": args.llm_latency,
+                    "tool_latency": args.tool_latency,
+                }
+            )
+            sweep_results.append(await run_scenario(scenario))
+        print(render(sweep_results))
+        results += sweep_results
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        if found:
+            print("\nRegressions:\n" + "\n".join(found))
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,4 +1,35 @@
-from .core import Swarm
-from .types import Agent
+"""A swarm of AI agents powered by Scrapybara.
 
-__all__ = ["Swarm", "Agent"]
+The public classes are imported on first use, so `import capyswarm` stays cheap for
+short-lived processes that only need part of the package (or none of it).
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .core import Swarm
+    from .jobs import SwarmJobRunner
+    from .pool import SwarmInstancePool
+    from .types import Agent
+
+_EXPORTS = {
+    "Swarm": ".core",
+    "SwarmJobRunner": ".jobs",
+    "SwarmInstancePool": ".pool",
+    "Agent": ".types",
+}
+
+__all__ = ["Swarm", "SwarmJobRunner", "SwarmInstancePool", "Agent"]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,335 @@
+import asyncio
+import inspect
+import json
+from concurrent.futures import Executor
+from contextlib import AsyncExitStack, nullcontext
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Type,
+)
+
+from scrapybara.client import StructuredOutputTool
+from scrapybara.core.api_error import ApiError
+from scrapybara.core.request_options import RequestOptions
+from scrapybara.types.tool import Tool
+from scrapybara.types.act import (
+    ActResponse,
+    ApiTool,
+    AssistantMessage,
+    Message,
+    Model,
+    SingleActRequest,
+    SingleActResponse,
+    Step,
+    TextPart,
+    TokenUsage,
+    ToolCallPart,
+    ToolMessage,
+    ToolResultPart,
+    UserMessage,
+)
+
+from .compaction import estimate_tokens
+from .governor import WORKER_PRIORITY, RateGovernor
+from .metrics import AgentMetrics
+from .retry import with_retries
+from .tools import AsyncTool
+
+
+async def call_tool(
+    tool: Tool,
+    args: Dict[str, Any],
+    executor: Optional[Executor] = None,
+    limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+    metrics: Optional[AgentMetrics] = None,
+    placement: Optional[Callable[[str], AsyncContextManager[None]]] = None,
+) -> Any:
+    """Run a single tool call without blocking the event loop.
+
+    Async tools are awaited directly. Plain synchronous tools run on the given executor
+    (the loop's default executor if None). If `limits` has a semaphore for the tool's
+    name, the call waits for a free slot first. With `placement`, the call then holds
+    the context it returns for the tool's name, e.g. a `PlacementScheduler` slot on the
+    agent's instance. If `timeouts` has a deadline for it, the call fails with a
+    TimeoutError once the deadline passes. The wait and the call are timed into
+    `metrics`, if given.
+    """
+    limit = limits.get(tool.name) if limits else None
+    timeout = timeouts.get(tool.name) if timeouts else None
+    async with AsyncExitStack() as stack:
+        if limit or placement:
+            with (
+                metrics.span("tool.wait", metrics.tool_wait, tool=tool.name)
+                if metrics
+                else nullcontext()
+            ):
+                if limit:
+                    await limit.acquire()
+                    stack.callback(limit.release)
+                if placement:
+                    await stack.enter_async_context(placement(tool.name))
+        with (
+            metrics.span(f"tool.{tool.name}", metrics.tool(tool.name))
+            if metrics
+            else nullcontext()
+        ):
+            if isinstance(tool, AsyncTool):
+                call = tool.acall(**args)
+            else:
+                loop = asyncio.get_running_loop()
+                call = loop.run_in_executor(executor, lambda: tool(**args))
+            try:
+                return await asyncio.wait_for(call, timeout)
+            except TimeoutError:
+                raise TimeoutError(f"{tool.name} timed out after {timeout} seconds")
+
+
+def _call_groups(
+    tool_calls: List[ToolCallPart], tools: List[Tool]
+) -> List[List[ToolCallPart]]:
+    """Split a step's tool calls into groups that are issued together.
+
+    Consecutive calls to a tool that batches (e.g. bash with `bash_batch_window`) form
+    one group, so the tool can pipeline them. Every other call is a group of its own and
+    starts once the previous group has finished.
+    """
+    batched = {t.name for t in tools if getattr(t, "batched", False)}
+    groups: List[List[ToolCallPart]] = []
+    for part in tool_calls:
+        if (
+            groups
+            and part.tool_name in batched
+            and groups[-1][-1].tool_name == part.tool_name
+        ):
+            groups[-1].append(part)
+        else:
+            groups.append([part])
+    return groups
+
+
+async def act_stream(
+    client: Any,
+    *,
+    model: Model,
+    tools: Optional[List[Tool]] = None,
+    system: Optional[str] = None,
+    prompt: Optional[str] = None,
+    messages: Optional[List[Message]] = None,
+    schema: Optional[Type[Any]] = None,
+    on_step: Optional[Callable[[Step], Optional[Awaitable[None]]]] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    request_options: Optional[RequestOptions] = None,
+    executor: Optional[Executor] = None,
+    limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+    prepare: Optional[Callable[[List[Message]], List[Message]]] = None,
+    max_retries: int = 0,
+    governor: Optional[RateGovernor] = None,
+    priority: int = WORKER_PRIORITY,
+    metrics: Optional[AgentMetrics] = None,
+    placement: Optional[Callable[[str], AsyncContextManager[None]]] = None,
+) -> AsyncGenerator[Step, None]:
+    """Run an agent loop against the Scrapybara act endpoint, yielding each step.
+
+    Mirrors `AsyncScrapybara.act_stream`, except that tool calls go through `call_tool`
+    so async tools never tie up a thread for the duration of a remote call. If given,
+    `prepare` rewrites the conversation before each request (e.g. to drop old images).
+    Transient request failures are retried up to `max_retries` times with backoff.
+    `on_step` may be a coroutine function, in which case the loop waits for it before
+    continuing. With a `governor`, every request (including retries) first waits for
+    rate limit capacity at the given `priority`. Tool calls hold `placement` (see
+    `call_tool`). Requests, waits, tool calls and token usage are recorded in
+    `metrics`, if given.
+    """
+    if messages is None:
+        if prompt is None:
+            raise ValueError("prompt or messages must be provided")
+        current_messages: List[Message] = [UserMessage(content=[TextPart(text=prompt)])]
+    else:
+        current_messages = list(messages)
+
+    current_tools = [] if tools is None else list(tools)
+    if schema:
+        current_tools.append(StructuredOutputTool(schema))
+    api_tools = [ApiTool.from_tool(tool) for tool in current_tools]
+    if governor:
+        fixed_tokens = (
+            len(system or "")
+            + len(json.dumps([t.model_dump() for t in api_tools], default=str))
+        ) // 4
+
+    while True:
+        if prepare:
+            current_messages = prepare(current_messages)
+        request = SingleActRequest(
+            model=model,
+            system=system,
+            messages=current_messages,
+            tools=api_tools,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+        tokens = fixed_tokens + estimate_tokens(current_messages) if governor else 0
+
+        async def send() -> SingleActResponse:
+            if governor:
+                with (
+                    metrics.span("act.wait", metrics.request_wait)
+                    if metrics
+                    else nullcontext()
+                ):
+                    await governor.acquire(tokens, priority)
+            used = None
+            try:
+                with (
+                    metrics.span("act.request", metrics.requests)
+                    if metrics
+                    else nullcontext()
+                ):
+                    response = await client.httpx_client.request(
+                        "v1/act",
+                        method="POST",
+                        json=request.model_dump(exclude_none=True),
+                        headers={"content-type": "application/json"},
+                        request_options=request_options,
+                    )
+                if not 200 <= response.status_code < 300:
+                    raise ApiError(
+                        status_code=response.status_code, body=response.json()
+                    )
+                act_response = SingleActResponse.model_validate(response.json())
+                if metrics:
+                    metrics.add_usage(act_response.usage)
+                if act_response.usage:
+                    used = act_response.usage.total_tokens
+                return act_response
+            finally:
+                if governor:
+                    governor.release(tokens, used)
+
+        act_response = await with_retries(send, max_retries)
+        current_messages.append(act_response.message)
+
+        text = "\n".join(
+            part.text
+            for part in act_response.message.content
+            if isinstance(part, TextPart)
+        )
+        tool_calls = [
+            part
+            for part in act_response.message.content
+            if isinstance(part, ToolCallPart)
+        ]
+        step = Step(
+            text=text,
+            tool_calls=tool_calls if tool_calls else None,
+            finish_reason=act_response.finish_reason,
+            usage=act_response.usage,
+        )
+
+        has_structured_output = False
+        if tool_calls:
+
+            async def run_call(part: ToolCallPart) -> ToolResultPart:
+                tool = next(t for t in current_tools if t.name == part.tool_name)
+                try:
+                    result = await call_tool(
+                        tool,
+                        part.args,
+                        executor,
+                        limits,
+                        timeouts,
+                        metrics,
+                        placement,
+                    )
+                    return ToolResultPart(
+                        tool_call_id=part.tool_call_id,
+                        tool_name=part.tool_name,
+                        result=result,
+                    )
+                except Exception as e:
+                    return ToolResultPart(
+                        tool_call_id=part.tool_call_id,
+                        tool_name=part.tool_name,
+                        result=str(e),
+                        is_error=True,
+                    )
+
+            has_structured_output = schema is not None and any(
+                part.tool_name == "structured_output" for part in tool_calls
+            )
+            tool_results: List[ToolResultPart] = []
+            for group in _call_groups(tool_calls, current_tools):
+                tool_results += await asyncio.gather(*map(run_call, group))
+            step.tool_results = tool_results
+            current_messages.append(ToolMessage(content=tool_results))
+
+        if on_step:
+            handled = on_step(step)
+            if inspect.isawaitable(handled):
+                await handled
+        yield step
+
+        if not tool_calls or has_structured_output:
+            break
+
+
+async def act(client: Any, **kwargs: Any) -> ActResponse:
+    """Run `act_stream` to completion and collect the result like `AsyncScrapybara.act`.
+
+    Unlike the Scrapybara client, the returned messages always hold the full
+    conversation, including the user message created from `prompt`, so callers can
+    replace their history with it.
+    """
+    messages = kwargs.get("messages")
+    result_messages: List[Message] = (
+        list(messages)
+        if messages is not None
+        else [UserMessage(content=[TextPart(text=kwargs["prompt"])])]
+    )
+    steps: List[Step] = []
+    prompt_tokens = completion_tokens = total_tokens = 0
+
+    async for step in act_stream(client, **kwargs):
+        steps.append(step)
+        result_messages.append(
+            AssistantMessage(
+                content=[TextPart(text=step.text)] + (step.tool_calls or [])
+            )
+        )
+        if step.tool_results:
+            result_messages.append(ToolMessage(content=step.tool_results))
+        if step.usage:
+            prompt_tokens += step.usage.prompt_tokens
+            completion_tokens += step.usage.completion_tokens
+            total_tokens += step.usage.total_tokens
+
+    output = None
+    schema = kwargs.get("schema")
+    if schema:
+        output = steps[-1].tool_results[-1].result if steps[-1].tool_results else None
+        output = schema.model_validate(output)
+
+    return ActResponse(
+        messages=result_messages,
+        steps=steps,
+        text=steps[-1].text if steps else None,
+        output=output,
+        usage=TokenUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=total_tokens,
+        )
+        if total_tokens > 0
+        else None,
+    )
@@ -0,0 +1,81 @@
+import os
+import time
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from scrapybara.types.act import Message
+
+from .tools import OrchestratorSchema
+from .types import TaskResult
+
+
+class RunCheckpoint(BaseModel):
+    """Everything needed to resume a run.
+
+    Attributes:
+        run_id (str): ID of the run
+        prompt (str): The task the swarm was given
+        plans (List[OrchestratorSchema]): The initial plan, then one per reassignment
+        task_results (Dict[str, TaskResult]): Outcome of every finished task
+        round_results (Dict[str, TaskResult]): Outcome of the finished tasks of the
+            latest plan, these are skipped when resuming
+        orchestrator_messages (List[Message]): The orchestrator's conversation
+        agent_messages (Dict[str, List[Message]]): Each worker's conversation
+        instances (Dict[str, str]): Instance ID per agent instance key
+        report (Optional[str]): The final report, once the run has finished
+        updated_at (float): When the checkpoint was taken
+    """
+
+    run_id: str
+    prompt: str
+    plans: List[OrchestratorSchema] = Field(default_factory=list)
+    task_results: Dict[str, TaskResult] = Field(default_factory=dict)
+    round_results: Dict[str, TaskResult] = Field(default_factory=dict)
+    orchestrator_messages: List[Message] = Field(default_factory=list)
+    agent_messages: Dict[str, List[Message]] = Field(default_factory=dict)
+    instances: Dict[str, str] = Field(default_factory=dict)
+    report: Optional[str] = None
+    updated_at: float = Field(default_factory=time.time)
+
+
+class CheckpointStore:
+    """Stores run checkpoints as JSON files, one per run.
+
+    Each save replaces the run's file atomically, so a crash mid-write leaves the
+    previous checkpoint intact.
+
+    Args:
+        directory (str): Directory the checkpoint files are written to
+    """
+
+    def __init__(self, directory: str = ".capyswarm/runs"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, run_id: str) -> str:
+        return os.path.join(self.directory, f"{run_id}.json")
+
+    def save(self, checkpoint: RunCheckpoint) -> None:
+        path = self._path(checkpoint.run_id)
+        with open(f"{path}.tmp", "w") as f:
+            f.write(checkpoint.model_dump_json())
+        os.replace(f"{path}.tmp", path)
+
+    def load(self, run_id: str) -> Optional[RunCheckpoint]:
+        if not os.path.exists(self._path(run_id)):
+            return None
+        with open(self._path(run_id)) as f:
+            return RunCheckpoint.model_validate_json(f.read())
+
+    def list(self) -> List[str]:
+        """IDs of the stored runs, most recently updated first"""
+        files = [f for f in os.listdir(self.directory) if f.endswith(".json")]
+        files.sort(
+            key=lambda f: os.path.getmtime(os.path.join(self.directory, f)),
+            reverse=True,
+        )
+        return [f.removesuffix(".json") for f in files]
+
+    def delete(self, run_id: str) -> None:
+        if os.path.exists(self._path(run_id)):
+            os.remove(self._path(run_id))
@@ -0,0 +1,226 @@
+import json
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Callable, List, Optional, Set
+
+from pydantic import BaseModel
+from scrapybara.types.act import (
+    ImagePart,
+    Message,
+    TextPart,
+    ToolCallPart,
+    ToolMessage,
+    ToolResultPart,
+    UserMessage,
+)
+
+IMAGE_TOKENS = 1600  # Rough cost of one screenshot, independent of its base64 size
+IMAGE_PLACEHOLDER = "[screenshot omitted]"
+DEFAULT_SUMMARY = re.compile(
+    r"\[(\d+) earlier messages were removed to save context"
+    r"(?:, including calls to (.*))?\]"
+)
+
+
+def _part_tokens(part: Any) -> int:
+    match part:
+        case TextPart():
+            return len(part.text) // 4
+        case ImagePart():
+            return IMAGE_TOKENS
+        case ToolCallPart():
+            return len(json.dumps(part.args, default=str)) // 4
+        case ToolResultPart():
+            result = part.result
+            if isinstance(result, dict) and result.get("base64_image"):
+                rest = {k: v for k, v in result.items() if k != "base64_image"}
+                return IMAGE_TOKENS + len(json.dumps(rest, default=str)) // 4
+            return len(json.dumps(result, default=str)) // 4
+    return 0
+
+
+def estimate_tokens(messages: List[Message]) -> int:
+    """Estimate the input tokens of a conversation (about 4 characters per token)"""
+    return sum(_part_tokens(part) for m in messages for part in m.content)
+
+
+def _has_image(message: Message) -> bool:
+    return any(
+        isinstance(part, ImagePart)
+        or (
+            isinstance(part, ToolResultPart)
+            and isinstance(part.result, dict)
+            and part.result.get("base64_image")
+        )
+        for part in message.content
+    )
+
+
+def _strip_images(message: Message) -> Message:
+    content = []
+    for part in message.content:
+        if isinstance(part, ImagePart):
+            part = TextPart(text=IMAGE_PLACEHOLDER)
+        elif isinstance(part, ToolResultPart) and isinstance(part.result, dict):
+            if part.result.get("base64_image"):
+                # Drop the image key itself, any base64_image is sent as an image
+                result = {k: v for k, v in part.result.items() if k != "base64_image"}
+                output = result.get("output")
+                result["output"] = (
+                    f"{output}\n{IMAGE_PLACEHOLDER}" if output else IMAGE_PLACEHOLDER
+                )
+                part = part.model_copy(update={"result": result})
+        content.append(part)
+    return message.model_copy(update={"content": content})
+
+
+def _default_summary(messages: List[Message]) -> str:
+    count = len(messages)
+    tools: Counter = Counter()
+    # Fold in the summary of an earlier pass, which comes first
+    if messages and len(messages[0].content) == 1:
+        part = messages[0].content[0]
+        match = isinstance(part, TextPart) and DEFAULT_SUMMARY.fullmatch(part.text)
+        if match:
+            count += int(match.group(1)) - 1
+            for call in (match.group(2) or "").split(", "):
+                name, _, n = call.rpartition(" (")
+                if name and n.endswith(")") and n[:-1].isdigit():
+                    tools[name] += int(n[:-1])
+    tools.update(
+        part.tool_name
+        for m in messages
+        for part in m.content
+        if isinstance(part, ToolCallPart)
+    )
+    calls = ", ".join(f"{name} ({n})" for name, n in tools.most_common())
+    return f"[{count} earlier messages were removed to save context" + (
+        f", including calls to {calls}]" if calls else "]"
+    )
+
+
+class CompactionResult(BaseModel):
+    """The outcome of compacting a conversation"""
+
+    messages: List[Message]
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class Compactor(ABC):
+    """Base class for history compaction, applied to an agent's messages before each act call.
+
+    Subclasses implement `compact`. The messages passed in must not be mutated.
+    """
+
+    tokens_saved: int = 0
+
+    @abstractmethod
+    def compact(self, messages: List[Message]) -> CompactionResult:
+        """Compact the messages, returning them with the token counts before and after"""
+
+    def __call__(self, messages: List[Message]) -> List[Message]:
+        result = self.compact(messages)
+        self.tokens_saved += result.tokens_saved
+        return result.messages
+
+
+class TokenBudgetCompactor(Compactor):
+    """Keeps a conversation under a token budget.
+
+    Screenshots older than the last `keep_images` are replaced by a placeholder first.
+    If the conversation is still over budget, the oldest turns after the first user
+    message are dropped, never separating a tool call from its result, and replaced by
+    a short summary. When turns are dropped again later, the earlier summary is handed
+    to `summarize` as the first message, and the new summary replaces it. The last
+    `keep_recent` turns are always kept.
+
+    Args:
+        max_tokens (int): Estimated input token budget for the conversation
+        keep_recent (int): Number of most recent turns that are never dropped
+        keep_images (int): Number of most recent messages whose images are kept inline
+        summarize (Optional[Callable[[List[Message]], str]]): Summarizes the dropped
+            messages, defaults to a note listing how many were dropped and which tools
+            they called
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 50_000,
+        keep_recent: int = 6,
+        keep_images: int = 1,
+        summarize: Optional[Callable[[List[Message]], str]] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.keep_images = keep_images
+        self.summarize = summarize or _default_summary
+        self.tokens_saved = 0
+        self._summaries: Set[str] = set()  # Summaries in the histories compacted so far
+
+    def compact(self, messages: List[Message]) -> CompactionResult:
+        tokens_before = estimate_tokens(messages)
+        if not messages:
+            return CompactionResult(messages=[], tokens_before=0, tokens_after=0)
+
+        # Strip stale screenshots, newest first
+        compacted: List[Message] = []
+        images_kept = 0
+        for message in reversed(messages):
+            if _has_image(message):
+                if images_kept < self.keep_images:
+                    images_kept += 1
+                else:
+                    message = _strip_images(message)
+            compacted.append(message)
+        compacted.reverse()
+
+        if estimate_tokens(compacted) > self.max_tokens:
+            compacted = self._drop_turns(compacted)
+
+        return CompactionResult(
+            messages=compacted,
+            tokens_before=tokens_before,
+            tokens_after=estimate_tokens(compacted),
+        )
+
+    def _drop_turns(self, messages: List[Message]) -> List[Message]:
+        # The first user message holds the original task, so it is always kept
+        head, rest = messages[0], messages[1:]
+
+        # A turn is a user or assistant message plus the tool results that follow it
+        turns: List[List[Message]] = []
+        for message in rest:
+            if isinstance(message, ToolMessage) and turns:
+                turns[-1].append(message)
+            else:
+                turns.append([message])
+
+        sizes = [estimate_tokens(turn) for turn in turns]
+        total = estimate_tokens([head]) + sum(sizes)
+        dropped: List[Message] = []
+        while len(turns) > self.keep_recent and total > self.max_tokens:
+            dropped.extend(turns.pop(0))
+            total -= sizes.pop(0)
+        if not dropped:
+            return messages
+
+        if isinstance(head, UserMessage):
+            content = list(head.content)
+            last = content[-1] if content else None
+            if isinstance(last, TextPart) and last.text in self._summaries:
+                # Replace the summary of an earlier pass rather than adding another
+                content.pop()
+                self._summaries.discard(last.text)
+                dropped.insert(0, UserMessage(content=[last]))
+            summary = self.summarize(dropped)
+            self._summaries.add(summary)
+            head = head.model_copy(
+                update={"content": content + [TextPart(text=summary)]}
+            )
+        return [head] + [m for turn in turns for m in turn]
@@ -1,17 +1,21 @@
 # Standard library imports
 import asyncio
-import webbrowser
-from typing import List, Optional, Dict
+import inspect
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Dict, Set
 
 # Package/library imports
 from scrapybara import AsyncScrapybara
 from scrapybara.core.api_error import ApiError
 from scrapybara.types.act import Message
-from scrapybara.types.act import UserMessage, TextPart
+from scrapybara.types.act import AssistantMessage, UserMessage, TextPart
 
 # Local imports
+from .act import act
 from .util import debug_print
-from .types import Agent
+from .types import Agent, TaskResult
 from .tools import (
     OrchestratorSchema,
     CommunicateTool,
@@ -20,7 +24,30 @@ from .tools import (
     AsyncComputerTool,
     AsyncEditTool,
 )
-from .prompts import get_orchestrator_prompt, get_agent_prompt
+from .scheduler import TaskGraph
+from .events import (
+    SwarmEvent,
+    PlanCreated,
+    TaskStarted,
+    AgentStep,
+    TaskFinished,
+    FinalReport,
+)
+from .pool import SwarmInstancePool
+from .checkpoints import CheckpointStore, RunCheckpoint
+from .plan_cache import PlanCache, plan_key
+from .governor import ORCHESTRATOR_PRIORITY, WORKER_PRIORITY, RateGovernor
+from .metrics import SwarmMetrics
+from .files import FileViewCache
+from .shell import BashRunner
+from .placement import PlacementScheduler
+from .mailbox import OrchestratorMailbox
+from .session import OrchestratorSession
+from .prompts import (
+    get_orchestrator_prompt,
+    get_agent_prompt,
+    get_reassignment_prompt,
+)
 
 
 class Swarm:
@@ -28,13 +55,101 @@ class Swarm:
     Args:
         agents (List[Agent]): List of agents, must include exactly one orchestrator
         api_key (Optional[str]): Scrapybara API key for authentication
+        pool (Optional[SwarmInstancePool]): Instance pool to provision from, share one
+            between swarms to reuse pre-warmed instances
+        detach_adopted (bool): Leave instances attached to by ID running on exit
+            instead of stopping them, so a later Swarm can reattach to them
+        teardown_timeout (float): Seconds to wait for each instance to stop on exit
+        tool_threads (int): Size of the thread pool that runs synchronous (non-async)
+            tools, async tools never use a thread
+        tool_limits (Optional[Dict[str, int]]): Maximum concurrent calls per tool name
+            across the swarm, e.g. {"computer": 4}
+        mailbox_window (float): Extra seconds the orchestrator waits to batch messages
+            from agents communicating at the same time into one turn
+        tool_timeouts (Optional[Dict[str, float]]): Deadline in seconds per tool name,
+            e.g. {"bash": 120}, a timed out call is returned to the agent as an error
+        max_reassignments (int): Rounds in which the orchestrator may reassign tasks
+            that failed, timed out or were cancelled
+        checkpoints (Optional[CheckpointStore]): Saves each run's progress after every
+            task, so it can be picked up again with `resume`
+        plan_cache (Optional[PlanCache]): Reuses the orchestrator's plan for runs with
+            the same prompt, agents and model instead of planning again
+        governor (Optional[RateGovernor]): Paces act requests to stay within requests
+            and tokens per minute limits, orchestrator turns go first
+        tracer (Optional[Any]): OpenTelemetry-style tracer, e.g.
+            `opentelemetry.trace.get_tracer("capyswarm")`, to record runs as spans
+        bash_batch_window (Optional[float]): Seconds to collect bash commands for the
+            same instance into one remote call, e.g. 0 to pipeline the consecutive bash
+            calls of a step, disabled if None
+        bash_cache_ttl (Optional[float]): Seconds to reuse the results of read-only bash
+            commands on the same instance, disabled if None
+        file_cache (bool): Serve the edit tool's `view` from a per-instance copy of each
+            file, kept up to date with the edits and cleared by bash commands and GUI
+            actions
+        placement (Optional[PlacementScheduler]): Coordinates agents sharing an
+            instance, GUI actions get it to themselves, and can spread agents running in
+            parallel across instances
     """
 
-    def __init__(self, agents: List[Agent], api_key: Optional[str] = None):
-        self.client = AsyncScrapybara(api_key=api_key)
+    def __init__(
+        self,
+        agents: List[Agent],
+        api_key: Optional[str] = None,
+        pool: Optional[SwarmInstancePool] = None,
+        detach_adopted: bool = False,
+        teardown_timeout: float = 30,
+        tool_threads: int = 16,
+        tool_limits: Optional[Dict[str, int]] = None,
+        mailbox_window: float = 0,
+        tool_timeouts: Optional[Dict[str, float]] = None,
+        max_reassignments: int = 1,
+        checkpoints: Optional[CheckpointStore] = None,
+        plan_cache: Optional[PlanCache] = None,
+        governor: Optional[RateGovernor] = None,
+        tracer: Optional[Any] = None,
+        bash_batch_window: Optional[float] = None,
+        bash_cache_ttl: Optional[float] = None,
+        file_cache: bool = False,
+        placement: Optional[PlacementScheduler] = None,
+    ):
+        self.client = pool.client if pool else AsyncScrapybara(api_key=api_key)
+        self.pool = pool or SwarmInstancePool(client=self.client)
+        self._owns_pool = pool is None
+        self.detach_adopted = detach_adopted
+        self.teardown_timeout = teardown_timeout
+        self._tool_executor = ThreadPoolExecutor(
+            max_workers=tool_threads, thread_name_prefix="capyswarm-tool"
+        )
+        self._tool_limits = {
+            name: asyncio.Semaphore(limit)
+            for name, limit in (tool_limits or {}).items()
+        }
         self.instances: Dict[str, any] = {}  # Track active Scrapybara instances
+        self._provisioning: Dict[str, asyncio.Task] = {}  # Instances being started
+        self._provisioner: Optional[asyncio.Task] = None  # The run's `_provision` task
         self.agents = agents
         self.running_tasks = {}  # Track running agent tasks
+        self._cancel_requested: Set[asyncio.Task] = set()  # Cancelled through `cancel`
+        self.task_results: Dict[str, TaskResult] = {}  # Outcome of each task
+        self.tool_timeouts = tool_timeouts or {}
+        self.max_reassignments = max_reassignments
+        self._events: Optional[asyncio.Queue] = None  # Consumed by `stream`
+        self.checkpoints = checkpoints
+        self.plan_cache = plan_cache
+        self.governor = governor
+        self.metrics = SwarmMetrics(tracer)  # Timings and tokens of the last run
+        self.bash_batch_window = bash_batch_window
+        self.bash_cache_ttl = bash_cache_ttl
+        self.file_cache = file_cache
+        self.bash_runners: Dict[str, BashRunner] = {}  # By instance ID
+        self.placement = placement
+        # Instance keys of agents moved onto their own instance by `placement`, by name
+        self._instance_keys: Dict[str, str] = {}
+        self._checkpoint_lock = asyncio.Lock()
+        self.run_id: Optional[str] = None  # ID of the current or last run
+        self._prompt: Optional[str] = None
+        self._plans: List[OrchestratorSchema] = []  # Initial plan and reassignments
+        self._round_results: Dict[str, TaskResult] = {}  # Results of the latest plan
 
         orchestrator = [agent for agent in agents if agent.orchestrator]
         match len(orchestrator):
@@ -46,6 +161,8 @@ class Swarm:
                 self.orchestrator.system = get_orchestrator_prompt(self.agents)
             case _:
                 raise ValueError("Cannot have multiple orchestrator agents")
+        self.session = OrchestratorSession(self)
+        self.mailbox = OrchestratorMailbox(self, window=mailbox_window)
 
         # Set up system prompts for regular agents
         for agent in self.agents:
@@ -57,60 +174,133 @@ class Swarm:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Clean up all Scrapybara instances"""
-        for instance in self.instances.values():
-            try:
-                await instance.browser.stop()
-                await instance.stop()
-            except ApiError as e:
-                print(f"Error {e.status_code}: {e.body}")
+        # Instances still starting would be stored after teardown and never stopped
+        await self._settle_provisioning()
+        instances = list({inst.id: inst for inst in self.instances.values()}.values())
+        if self.detach_adopted:
+            # Leave instances we only attached to running for the next Swarm
+            instances = [inst for inst in instances if self.pool.started(inst)]
+
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(self._teardown_instance(inst), self.teardown_timeout)
+                for inst in instances
+            ),
+            return_exceptions=True,
+        )
+        for instance, result in zip(instances, results):
+            match result:
+                case ApiError():
+                    print(f"Error {result.status_code}: {result.body}")
+                case TimeoutError():
+                    print(f"Timed out stopping instance {instance.id}")
+                case BaseException():
+                    print(f"Error stopping instance {instance.id}: {result}")
+
+        await self.flush_steps()
         self.instances.clear()
+        self._provisioning.clear()
+        self._provisioner = None
+        self._instance_keys.clear()
+        self.bash_runners.clear()
+        self._tool_executor.shutdown(wait=False)
+        if self._owns_pool:
+            await self.pool.close()
+
+    async def _settle_provisioning(self) -> None:
+        """Wait for every instance that is still starting to be stored in `instances`.
+
+        Instances are not cancelled midway, a start cancelled after the request went out
+        would leave an instance running that nobody knows about.
+        """
+        pending = [t for t in self._provisioning.values() if not t.done()]
+        if self._provisioner is not None and not self._provisioner.done():
+            pending.append(self._provisioner)
+        if pending:
+            # `wait` rather than `gather`, cancelling the caller must not cancel them
+            await asyncio.wait(pending)
+
+    async def _teardown_instance(self, instance: any) -> None:
+        # Only Ubuntu instances run a separate browser
+        if hasattr(instance, "browser"):
+            await instance.browser.stop()
+        if self.pool.started(instance):
+            await self.pool.release(instance)
+        else:
+            await instance.stop()
 
     async def _get_or_create_instance(
         self, agent: Agent, interactive: bool = False
     ) -> any:
         """Get existing instance or create new one for agent"""
-        if agent.instance in self.instances:
-            return self.instances[agent.instance]
-
+        key = self._instance_key(agent)
+        if key in self.instances:
+            return self.instances[key]
+
+        # Agents sharing an instance wait on the same provisioning task
+        if key not in self._provisioning:
+            self._provisioning[key] = asyncio.create_task(
+                self._provision_instance(agent, key, interactive)
+            )
         try:
-            if agent.instance == "shared":
-                # Create new instance based on instance_type
-                match agent.instance_type:
-                    case "ubuntu":
-                        instance = await self.client.start_ubuntu(timeout_hours=1)
-                    case "windows":
-                        instance = await self.client.start_windows(timeout_hours=1)
-                    case "browser":
-                        instance = await self.client.start_browser(timeout_hours=1)
+            return await self._provisioning[key]
+        except Exception as e:
+            # Let the next caller retry instead of re-raising a stale failure
+            self._provisioning.pop(key, None)
+            if isinstance(e, ApiError):
+                print(f"Error {e.status_code}: {e.body}")
+            raise e
+
+    def _instance_key(self, agent: Agent) -> str:
+        """The key of the agent's instance in `instances`, `agent.instance` unless moved"""
+        return self._instance_keys.get(agent.name, agent.instance)
+
+    async def _provision_instance(
+        self, agent: Agent, key: str, interactive: bool
+    ) -> any:
+        with self.metrics.provision(agent.instance_type):
+            if agent.instance == "shared" or key != agent.instance:
+                instance = await self.pool.acquire(agent.instance_type)
             else:
-                try:
-                    # Try to find existing instance
-                    instance = next(
-                        inst
-                        for inst in await self.client.get_instances()
-                        if inst.id == agent.instance
-                    )
-                except StopIteration:
+                # Try to find existing instance
+                instance = await self.pool.find(agent.instance)
+                if instance is None:
                     # If instance not found, create a new one with the specified instance type
                     print(f"Instance {agent.instance} not found, creating new instance")
-                    match agent.instance_type:
-                        case "ubuntu":
-                            instance = await self.client.start_ubuntu(timeout_hours=1)
-                        case "windows":
-                            instance = await self.client.start_windows(timeout_hours=1)
-                        case "browser":
-                            instance = await self.client.start_browser(timeout_hours=1)
-
-            if interactive:
-                stream_url = await instance.get_stream_url()
-                webbrowser.open(stream_url.stream_url)
-                await asyncio.sleep(7)
-
-            self.instances[agent.instance] = instance
-            return instance
-        except ApiError as e:
-            print(f"Error {e.status_code}: {e.body}")
-            raise e
+                    instance = await self.pool.acquire(agent.instance_type)
+
+        if interactive:
+            stream_url = await instance.get_stream_url()
+            import webbrowser
+
+            webbrowser.open(stream_url.stream_url)
+            await asyncio.sleep(7)
+
+        self.instances[key] = instance
+        return instance
+
+    async def _provision(self, agents: List[Agent], interactive: bool = False) -> None:
+        """Provision the instances of the given agents in parallel"""
+        results = await asyncio.gather(
+            *(
+                self._get_or_create_instance(agent, interactive and agent.orchestrator)
+                for agent in agents
+            ),
+            return_exceptions=True,
+        )
+        for agent, result in zip(agents, results):
+            if isinstance(result, asyncio.CancelledError):
+                continue  # The run was cancelled, not an error of the instance
+            if isinstance(result, BaseException):
+                print(f"Error provisioning instance for {agent.name}: {result}")
+
+    def _assign(self, agent: Agent, prompt: str) -> None:
+        """Give an agent a new task, adding it to the history if it already has one"""
+        agent.prompt = prompt
+        if agent.messages is not None:
+            agent.messages.append(
+                UserMessage(content=[TextPart(type="text", text=prompt)])
+            )
 
     def _setup_agent_tools(self, agent: Agent, instance: any) -> List:
         """Set up the appropriate tools for an agent."""
@@ -124,100 +314,451 @@ class Swarm:
         if agent.tools:
             return agent.tools + tools
 
+        runner = self._bash_runner(instance)
         default_tools = [
-            AsyncBashTool(instance),
-            AsyncComputerTool(instance),
-            AsyncEditTool(instance),
+            AsyncBashTool(instance, runner),
+            AsyncComputerTool(instance, agent.screenshots, runner),
+            AsyncEditTool(instance, runner),
         ]
         return default_tools + tools
 
-    async def run_agent_task(self, agent: Agent, interactive: bool = False):
-        """Run a single agent's assigned task"""
-        try:
-            instance = await self._get_or_create_instance(agent, interactive)
-            tools = self._setup_agent_tools(agent, instance)
-
-            response = await self.client.act(
-                model=agent.model,
-                tools=tools,
-                system=agent.system,
-                prompt=agent.prompt,
-                messages=agent.messages,
-                schema=agent.response_schema,
-                on_step=agent.on_step,
+    def _bash_runner(self, instance: any) -> Optional[BashRunner]:
+        """The bash runner shared by every agent on an instance, if one is needed"""
+        if (
+            self.bash_batch_window is None
+            and self.bash_cache_ttl is None
+            and not self.file_cache
+        ):
+            return None
+        if instance.id not in self.bash_runners:
+            self.bash_runners[instance.id] = BashRunner(
+                instance,
+                self.bash_batch_window,
+                self.bash_cache_ttl,
+                FileViewCache() if self.file_cache else None,
             )
+        return self.bash_runners[instance.id]
+
+    async def _act(self, agent: Agent, interactive: bool = False, **act_kwargs):
+        """Run one act call for an agent, raising on failure or when it times out"""
+        instance = await self._get_or_create_instance(agent, interactive)
+        tools = self._setup_agent_tools(agent, instance)
+
+        params = dict(
+            model=agent.model,
+            tools=tools,
+            system=agent.system,
+            prompt=agent.prompt,
+            messages=agent.messages,
+            schema=agent.response_schema,
+            on_step=agent.on_step,
+        )
+        params.update(act_kwargs)
+        if self._events is not None:
+            params["on_step"] = self._streaming_step_handler(agent, params["on_step"])
+        if agent.compactor and params["messages"]:
+            params["messages"] = agent.compactor(params["messages"])
+        if agent.image_store:
+            params.setdefault("prepare", agent.image_store.apply)
+        response = await asyncio.wait_for(
+            act(
+                self.client,
+                **params,
+                executor=self._tool_executor,
+                limits=self._tool_limits,
+                timeouts=self.tool_timeouts,
+                max_retries=agent.max_retries,
+                governor=self.governor,
+                metrics=self.metrics.agent(agent.name),
+                placement=partial(self.placement.use, instance.id, agent.name)
+                if self.placement
+                else None,
+                priority=ORCHESTRATOR_PRIORITY
+                if agent.orchestrator
+                else WORKER_PRIORITY,
+            ),
+            agent.timeout,
+        )
 
-            if agent.messages is None:
-                agent.messages = response.messages
-            else:
-                agent.messages.extend(response.messages)
+        # The response holds the full conversation, including the prompt
+        agent.messages = response.messages
+        if agent.image_store:
+            agent.messages = agent.image_store.apply(agent.messages)
+            agent.steps.rewrite(agent.image_store.apply_steps)
+
+        return response
+
+    def _streaming_step_handler(self, agent: Agent, on_step):
+        """Wrap a step handler so each step is also published to the event stream"""
+
+        async def handler(step):
+            if on_step:
+                handled = on_step(step)
+                if inspect.isawaitable(handled):
+                    await handled
+            await self.emit(AgentStep(agent_name=agent.name, step=step))
 
-            return response
+        return handler
+
+    async def flush_steps(self) -> None:
+        """Wait until the agents' step sinks have written every step"""
+        sinks = {id(a.step_sink): a.step_sink for a in self.agents if a.step_sink}
+        await asyncio.gather(*(sink.flush() for sink in sinks.values()))
+
+    async def emit(self, event: SwarmEvent) -> None:
+        """Publish an event to the running `stream`, if any.
+
+        Waits while the stream's buffer is full, so a slow consumer slows the swarm
+        down instead of letting events pile up in memory.
+        """
+        if self._events is not None:
+            await self._events.put(event)
+
+    async def run_agent_task(
+        self, agent: Agent, interactive: bool = False, **act_kwargs
+    ):
+        """Run a single agent's assigned task
+
+        Keyword arguments override the agent's own act parameters (e.g. messages,
+        schema or on_step) for this call only.
+        """
+        try:
+            return await self._act(agent, interactive, **act_kwargs)
+        except TimeoutError:
+            print(f"Agent {agent.name} timed out after {agent.timeout} seconds")
+            return None
         except Exception as e:
             print(f"Error running agent {agent.name}: {e}")
             return None
 
-    async def run(
-        self,
-        prompt: str,
-        messages: Optional[List[Message]] = None,
-        debug: bool = False,
-        interactive: bool = False,
-    ) -> str:
-        """Execute a task using the swarm of agents.
+    def cancel(self, agent_name: str) -> bool:
+        """Cancel the task an agent is currently working on.
 
-        Args:
-            prompt (str): The main task description for the swarm
-            messages (Optional[List[Message]]): Initial messages for context
-            debug (bool): Whether to print debug information during execution
-            interactive (bool): Whether to open a browser stream
+        The task is reported to the orchestrator as cancelled and the tasks that depend
+        on it are released.
 
         Returns:
-            str: The final aggregated report from the orchestrator
+            bool: Whether a running task was cancelled
         """
-        self.orchestrator.prompt = prompt
-        self.orchestrator.messages = messages
+        task = self.running_tasks.get(agent_name)
+        if task is None or task.done():
+            return False
+        self._cancel_requested.add(task)
+        return task.cancel()
 
-        # Initial planning phase
-        orchestrator_completion = await self.run_agent_task(
-            self.orchestrator, interactive
+    async def _run_assignment(
+        self,
+        assignment: OrchestratorSchema.TaskAssignment,
+        agent_locks: Dict[str, asyncio.Lock],
+        debug: bool = False,
+    ) -> TaskResult:
+        result = TaskResult(
+            task_id=assignment.task_id,
+            agent_name=assignment.agent_name,
+            status="failed",
         )
-        self.orchestrator.response_schema = None
+        target_agent = next(
+            (a for a in self.agents if a.name == assignment.agent_name), None
+        )
+        if not target_agent:
+            debug_print(debug, f"Skipping {assignment.task_id}: unknown agent")
+            result.error = f"Agent {assignment.agent_name} not found"
+            await self.emit(TaskFinished(result=result))
+            return result
+
+        # An agent works on one assignment at a time
+        lock = agent_locks.setdefault(target_agent.name, asyncio.Lock())
+        metrics = self.metrics.agent(target_agent.name)
+        try:
+            with metrics.span("task.wait", metrics.task_wait, task_id=result.task_id):
+                await lock.acquire()
+            try:
+                with metrics.span("task", metrics.tasks, task_id=result.task_id):
+                    debug_print(
+                        debug, f"Starting {assignment.task_id} ({target_agent.name})..."
+                    )
+                    self._assign(target_agent, assignment.prompt)
+                    if self.placement and self.placement.spread:
+                        self._spread(target_agent)
+                    self.running_tasks[target_agent.name] = asyncio.current_task()
+                    await self.emit(
+                        TaskStarted(
+                            task_id=result.task_id,
+                            agent_name=target_agent.name,
+                            prompt=assignment.prompt,
+                        )
+                    )
+                    response = await self._act(target_agent)
+                    result.status = "completed"
+                    result.output = response.text
+            finally:
+                lock.release()
+        except asyncio.CancelledError:
+            # Only `cancel` ends the task with a result, cancelling the run (by the
+            # caller, a timeout or the task graph) must propagate
+            task = asyncio.current_task()
+            if task not in self._cancel_requested:
+                raise
+            self._cancel_requested.discard(task)
+            if task.uncancel() > 0:
+                raise
+            result.status = "cancelled"
+            result.error = "Cancelled"
+        except TimeoutError:
+            result.status = "timed_out"
+            result.error = f"Timed out after {target_agent.timeout} seconds"
+        except Exception as e:
+            print(f"Error running agent {target_agent.name}: {e}")
+            result.error = str(e) or type(e).__name__
 
-        debug_print(debug, orchestrator_completion)
+        debug_print(debug, f"Finished {assignment.task_id}: {result.status}")
+        self.task_results[result.task_id] = result
+        self._round_results[result.task_id] = result
+        await self.emit(TaskFinished(result=result))
+        await self._checkpoint()
+        return result
 
-        if not orchestrator_completion or not orchestrator_completion.output:
-            return "Failed to create initial plan"
+    def _spread(self, agent: Agent) -> None:
+        """Give an agent an instance of its own if another agent's task is using its.
 
-        plan = orchestrator_completion.output
+        The move is kept on the swarm until it exits, the agent itself is not changed.
+        """
+        key = self._instance_key(agent)
+        busy = any(
+            other is not agent
+            and self._instance_key(other) == key
+            and (task := self.running_tasks.get(other.name)) is not None
+            and not task.done()
+            for other in self.agents
+        )
+        if busy:
+            self._instance_keys[agent.name] = f"{agent.instance}:{agent.name}"
 
-        # Group tasks by priority
-        priority_groups = {}
-        for assignment in plan.task_assignments:
-            priority = assignment.priority
-            if priority not in priority_groups:
-                priority_groups[priority] = []
-            priority_groups[priority].append(assignment)
+    async def _execute_plan(
+        self,
+        graph: TaskGraph,
+        debug: bool = False,
+        completed: Optional[Dict[str, TaskResult]] = None,
+    ):
+        """Execute each task as soon as the tasks it depends on have finished.
 
-        # Execute tasks in priority order
-        for priority in sorted(priority_groups.keys(), reverse=True):
-            debug_print(debug, f"Executing priority {priority} tasks...")
-            priority_tasks = []
+        Tasks in `completed` (finished before the run was resumed) are not run again.
+        """
+        self._round_results = dict(completed or {})
+        agent_locks: Dict[str, asyncio.Lock] = {}
+
+        async def run_task(assignment: OrchestratorSchema.TaskAssignment):
+            if assignment.task_id in self._round_results:
+                return self._round_results[assignment.task_id]
+            self.metrics.agent(assignment.agent_name).dependency_wait.add(
+                graph.dependency_wait.get(assignment.task_id, 0.0)
+            )
+            return await self._run_assignment(assignment, agent_locks, debug)
+
+        results = await graph.execute(run_task)
+        return [r for r in results.values() if isinstance(r, TaskResult)]
+
+    async def _add_plan(self, plan: OrchestratorSchema) -> None:
+        self._plans.append(plan)
+        await self.emit(PlanCreated(plan=plan))
+        await self._checkpoint()
+
+    async def _checkpoint(self, report: Optional[str] = None) -> None:
+        """Save the run's progress, if checkpointing is enabled"""
+        if not self.checkpoints or not self.run_id:
+            return
+        checkpoint = RunCheckpoint(
+            run_id=self.run_id,
+            prompt=self._prompt,
+            plans=self._plans,
+            task_results=self.task_results,
+            round_results=self._round_results,
+            orchestrator_messages=list(self.session.snapshot()),
+            agent_messages={
+                agent.name: agent.messages
+                for agent in self.agents
+                if not agent.orchestrator and agent.messages
+            },
+            instances={key: inst.id for key, inst in self.instances.items()},
+            report=report,
+        )
+        # Serialized so an older checkpoint never overwrites a newer one
+        async with self._checkpoint_lock:
+            try:
+                await asyncio.to_thread(self.checkpoints.save, checkpoint)
+            except Exception as e:
+                print(f"Error saving checkpoint for run {self.run_id}: {e}")
+
+    def _start_provisioning(self, interactive: bool) -> asyncio.Task:
+        """Start every instance up front, tasks await their own agent's instance"""
+        self.pool.invalidate()
+        self._provisioner = asyncio.create_task(
+            self._provision(
+                [self.orchestrator] + [a for a in self.agents if not a.orchestrator],
+                interactive,
+            )
+        )
+        return self._provisioner
 
-            # Create tasks for this priority level
-            for assignment in priority_groups[priority]:
-                target_agent = next(
-                    (a for a in self.agents if a.name == assignment.agent_name), None
+    async def _run(
+        self,
+        prompt: str,
+        messages: Optional[List[Message]] = None,
+        debug: bool = False,
+        interactive: bool = False,
+        run_id: Optional[str] = None,
+    ) -> str:
+        """Plan, execute and report on a task, publishing events along the way"""
+        self.session.reset(messages)
+        self.task_results = {}
+        self._round_results = {}
+        self._plans = []
+        self.run_id = run_id or uuid.uuid4().hex
+        self._prompt = prompt
+
+        self._start_provisioning(interactive)
+        try:
+            return await self._plan_and_complete(prompt, messages, debug, interactive)
+        finally:
+            # Also when the run fails or is cancelled, so teardown sees every instance
+            await self._settle_provisioning()
+
+    async def _plan_and_complete(
+        self,
+        prompt: str,
+        messages: Optional[List[Message]],
+        debug: bool,
+        interactive: bool,
+    ) -> str:
+        """Plan the task and run it, the body of `_run`"""
+        # Initial planning phase, replayed from the cache when possible
+        key = plan_key(prompt, self.agents, messages) if self.plan_cache else None
+        plan = self.plan_cache.get(key) if key else None
+        if plan:
+            debug_print(debug, "Using cached plan")
+            self._replay_plan(prompt, plan)
+        else:
+            with self.metrics.phase("planning"):
+                orchestrator_completion = await self.session.turn(
+                    prompt=prompt,
+                    interactive=interactive,
+                    schema=self.orchestrator.response_schema,
                 )
-                if target_agent:
-                    target_agent.prompt = assignment.prompt
-                    task = asyncio.create_task(self.run_agent_task(target_agent))
-                    priority_tasks.append(task)
-                    self.running_tasks[target_agent.name] = task
+            debug_print(debug, orchestrator_completion)
+            if not orchestrator_completion or not orchestrator_completion.output:
+                return "Failed to create initial plan"
+            plan = orchestrator_completion.output
+
+        # Tasks start without waiting for the other instances, each one only waits
+        # for its own agent's instance
+        await self._add_plan(plan)
+
+        try:
+            graph = TaskGraph(plan.task_assignments)
+        except ValueError as e:
+            return f"Failed to schedule plan: {e}"
+        if key:
+            self.plan_cache.put(key, plan)
 
-            # Wait for all tasks of this priority to complete before moving to next priority
-            await asyncio.gather(*priority_tasks, return_exceptions=True)
-            debug_print(debug, f"Completed priority {priority} tasks")
+        return await self._complete(graph, debug)
+
+    def _replay_plan(self, prompt: str, plan: OrchestratorSchema) -> None:
+        """Record a cached plan in the orchestrator's history as if it had just made it"""
+        self.orchestrator.prompt = prompt
+        self.session.reset(
+            list(self.session.snapshot())
+            + [
+                UserMessage(content=[TextPart(type="text", text=prompt)]),
+                AssistantMessage(
+                    content=[TextPart(type="text", text=plan.model_dump_json())]
+                ),
+            ]
+        )
+
+    async def _resume(self, run_id: str, debug: bool, interactive: bool) -> str:
+        """Restore a run from its checkpoint and carry on where it stopped"""
+        if not self.checkpoints:
+            raise ValueError("Swarm has no checkpoint store to resume from")
+        checkpoint = await asyncio.to_thread(self.checkpoints.load, run_id)
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint found for run {run_id}")
+        if checkpoint.report is not None:
+            return checkpoint.report
+        if not checkpoint.plans:
+            # Stopped while planning, nothing worth keeping
+            return await self._run(checkpoint.prompt, None, debug, interactive, run_id)
+
+        self.run_id = run_id
+        self._prompt = checkpoint.prompt
+        self._plans = list(checkpoint.plans)
+        self.task_results = dict(checkpoint.task_results)
+        self.session.reset(checkpoint.orchestrator_messages)
+        for agent in self.agents:
+            if agent.orchestrator:
+                continue
+            history = list(checkpoint.agent_messages.get(agent.name, []))
+            # Drop the assignment of a task that was interrupted, it is assigned again
+            if history and isinstance(history[-1], UserMessage):
+                history.pop()
+            agent.messages = history or None
+
+        # Reattach to the instances that are still running
+        self.pool.invalidate()
+        for key, instance_id in checkpoint.instances.items():
+            if key not in self.instances:
+                instance = await self.pool.find(instance_id)
+                if instance is not None:
+                    self.instances[key] = instance
+        self._start_provisioning(interactive)
+
+        debug_print(debug, f"Resuming run {run_id}...")
+        completed = {
+            task_id: result
+            for task_id, result in checkpoint.round_results.items()
+            if result.status == "completed"
+        }
+        try:
+            try:
+                graph = TaskGraph(self._plans[-1].task_assignments)
+            except ValueError as e:
+                return f"Failed to schedule plan: {e}"
+            return await self._complete(graph, debug, completed)
+        finally:
+            await self._settle_provisioning()
+
+    async def _complete(
+        self,
+        graph: TaskGraph,
+        debug: bool = False,
+        completed: Optional[Dict[str, TaskResult]] = None,
+    ) -> str:
+        """Execute a plan, reassign the work that did not complete and report"""
+        with self.metrics.phase("execution"):
+            results = await self._execute_plan(graph, debug, completed)
+
+        # Give the orchestrator a chance to reassign work that did not complete
+        for _ in range(self.max_reassignments - (len(self._plans) - 1)):
+            failed = [r for r in results if r.status != "completed"]
+            if not failed:
+                break
+            debug_print(debug, f"Reassigning {len(failed)} unfinished tasks...")
+            failure_message = UserMessage(
+                content=[TextPart(type="text", text=get_reassignment_prompt(failed))]
+            )
+            with self.metrics.phase("replanning"):
+                replan = await self.session.turn(
+                    [failure_message], schema=self.orchestrator.response_schema
+                )
+            if not replan or not replan.output or not replan.output.task_assignments:
+                break
+            await self._add_plan(replan.output)
+            try:
+                graph = TaskGraph(replan.output.task_assignments)
+            except ValueError as e:
+                debug_print(debug, f"Failed to schedule reassigned tasks: {e}")
+                break
+            with self.metrics.phase("execution"):
+                results = await self._execute_plan(graph, debug)
 
         # Final aggregation phase
         orchestrator_prompt = """
@@ -229,6 +770,125 @@ class Swarm:
         orchestrator_message = UserMessage(
             content=[TextPart(type="text", text=orchestrator_prompt)]
         )
-        self.orchestrator.messages.append(orchestrator_message)
-        final_report = await self.run_agent_task(self.orchestrator)
-        return final_report.text if final_report else "Failed to generate final report"
+        with self.metrics.phase("report"):
+            final_report = await self.session.turn([orchestrator_message], schema=None)
+        if not final_report:
+            return "Failed to generate final report"
+        await self._checkpoint(report=final_report.text)
+        return final_report.text
+
+    async def _stream(
+        self, run: Callable[[], Awaitable[str]], max_buffered: int
+    ) -> AsyncIterator[SwarmEvent]:
+        """Drive `run` in the background, yielding the events it publishes"""
+        if self._events is not None:
+            raise RuntimeError("Swarm is already running")
+        events: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+        self._events = events
+
+        async def produce():
+            self.metrics.reset()
+            try:
+                with self.metrics.phase("run"):
+                    report = await run()
+                await self.flush_steps()
+                await self.emit(FinalReport(report=report))
+                await events.put(None)  # End of the stream
+            except Exception as e:
+                await events.put(e)  # Raised to the consumer
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (event := await events.get()) is not None:
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            # Stop publishing, then unblock anything still waiting on the full buffer
+            self._events = None
+            producer.cancel()
+            while not events.empty():
+                events.get_nowait()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+    def stream(
+        self,
+        prompt: str,
+        messages: Optional[List[Message]] = None,
+        debug: bool = False,
+        interactive: bool = False,
+        max_buffered: int = 100,
+    ) -> AsyncIterator[SwarmEvent]:
+        """Execute a task using the swarm of agents, yielding events as they happen.
+
+        Events are the plan, each task starting and finishing, every agent step,
+        messages between agents and the orchestrator and finally the report. Agents
+        wait while `max_buffered` events are waiting to be consumed. Closing the
+        stream early (e.g. with `contextlib.aclosing`) cancels the run.
+
+        Args:
+            prompt (str): The main task description for the swarm
+            messages (Optional[List[Message]]): Initial messages for context
+            debug (bool): Whether to print debug information during execution
+            interactive (bool): Whether to open a browser stream
+            max_buffered (int): Maximum number of events waiting to be consumed
+
+        Yields:
+            SwarmEvent: Events in the order they happened, ending with a FinalReport
+        """
+        return self._stream(
+            lambda: self._run(prompt, messages, debug, interactive), max_buffered
+        )
+
+    async def run(
+        self,
+        prompt: str,
+        messages: Optional[List[Message]] = None,
+        debug: bool = False,
+        interactive: bool = False,
+    ) -> str:
+        """Execute a task using the swarm of agents.
+
+        Args:
+            prompt (str): The main task description for the swarm
+            messages (Optional[List[Message]]): Initial messages for context
+            debug (bool): Whether to print debug information during execution
+            interactive (bool): Whether to open a browser stream
+
+        Returns:
+            str: The final aggregated report from the orchestrator
+        """
+        return await self._final_report(
+            self.stream(prompt, messages, debug, interactive)
+        )
+
+    async def resume(
+        self, run_id: str, debug: bool = False, interactive: bool = False
+    ) -> str:
+        """Continue a checkpointed run, e.g. after the process running it died.
+
+        Completed tasks of the latest plan are skipped, the agents' histories are
+        restored and instances that are still running are reattached to. Tasks that
+        were interrupted are started again.
+
+        Args:
+            run_id (str): ID of the run, `swarm.run_id` or one of `checkpoints.list()`
+            debug (bool): Whether to print debug information during execution
+            interactive (bool): Whether to open a browser stream
+
+        Returns:
+            str: The final aggregated report from the orchestrator
+        """
+        return await self._final_report(
+            self._stream(lambda: self._resume(run_id, debug, interactive), 100)
+        )
+
+    async def _final_report(self, events: AsyncIterator[SwarmEvent]) -> str:
+        report = "Failed to generate final report"
+        async for event in events:
+            if isinstance(event, FinalReport):
+                report = event.report
+        return report
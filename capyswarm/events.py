@@ -0,0 +1,59 @@
+from typing import Literal, Optional, Union
+
+from pydantic import BaseModel
+from scrapybara.types.act import Step
+
+from .tools import OrchestratorSchema
+from .types import TaskResult
+
+
+class PlanCreated(BaseModel):
+    """The orchestrator produced a plan (initially, or when reassigning tasks)"""
+
+    type: Literal["plan_created"] = "plan_created"
+    plan: OrchestratorSchema
+
+
+class TaskStarted(BaseModel):
+    """An agent started working on an assignment"""
+
+    type: Literal["task_started"] = "task_started"
+    task_id: str
+    agent_name: str
+    prompt: str
+
+
+class AgentStep(BaseModel):
+    """An agent (or the orchestrator) completed a step of its act loop"""
+
+    type: Literal["step"] = "step"
+    agent_name: str
+    step: Step
+
+
+class Communication(BaseModel):
+    """An agent messaged the orchestrator and received a reply"""
+
+    type: Literal["communicate"] = "communicate"
+    agent_name: str
+    message: str
+    reply: Optional[str] = None
+
+
+class TaskFinished(BaseModel):
+    """An assignment finished, successfully or not"""
+
+    type: Literal["task_finished"] = "task_finished"
+    result: TaskResult
+
+
+class FinalReport(BaseModel):
+    """The run is over, `report` is what `Swarm.run` returns"""
+
+    type: Literal["final_report"] = "final_report"
+    report: str
+
+
+SwarmEvent = Union[
+    PlanCreated, TaskStarted, AgentStep, Communication, TaskFinished, FinalReport
+]
@@ -0,0 +1,155 @@
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+NUMBERED_LINE = re.compile(r" *(\d+)(?:\t(.*))?")
+
+
+class _CachedFile:
+    def __init__(self, header: str, lines: List[str], result: Dict[str, Any]):
+        self.header = header  # e.g. "Here's the result of running `cat -n` on /a:"
+        self.lines = lines  # With tabs expanded, like the edit tool stores them
+        self.result = result  # Other fields of the view result
+
+
+def parse_view(output: str) -> Optional[Tuple[str, List[str]]]:
+    """Header and lines of a full-file `view` output, None if it is anything else"""
+    header, _, body = output.partition("\n")
+    if not header.endswith(":") or not body:
+        return None
+    rows = body.split("\n")
+    if rows[-1] == "":
+        rows.pop()  # The newline after the last line
+    lines = []
+    for number, row in enumerate(rows, start=1):
+        match = NUMBERED_LINE.fullmatch(row)
+        if not match or int(match.group(1)) != number:
+            return None  # E.g. a directory listing or an error message
+        lines.append(match.group(2) or "")
+    return header, lines
+
+
+class FileViewCache:
+    """Contents of the files viewed through the edit tool on one instance.
+
+    The first `view` of a file fetches all of it, later views of any range are rendered
+    from the cached copy. `create`, `str_replace` and `insert` on a cached file are
+    applied to the cached copy once the instance reports success, so it stays in step
+    with the file. Every bash command and GUI action that may write clears the cache
+    (see `BashRunner`), and so does anything the cache cannot follow, e.g. `undo_edit`,
+    a failed edit or two edits at once.
+
+    Args:
+        max_entries (int): Maximum number of files kept, least recently viewed go first
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._files: OrderedDict[str, _CachedFile] = OrderedDict()
+        self._generation = 0  # Bumped on every change, stale results are not stored
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def clear(self) -> None:
+        self._files.clear()
+        self._generation += 1
+
+    def drop(self, path: str) -> None:
+        self._files.pop(path, None)
+        self._generation += 1
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._files
+
+    def view(
+        self, path: str, view_range: Optional[Tuple[int, int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """A view result from the cache, None if the file or range is not cached"""
+        if path not in self._files:
+            self.misses += 1
+            return None
+        result = self.render(path, view_range)
+        if result is not None:
+            self._files.move_to_end(path)
+            self.hits += 1
+        return result
+
+    def render(
+        self, path: str, view_range: Optional[Tuple[int, int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Format a cached file like the edit tool's `view`, None if out of range"""
+        cached = self._files.get(path)
+        if cached is None:
+            return None
+        lines = cached.lines
+        start, end = view_range or (1, -1)
+        # Invalid ranges go to the instance, which words the error
+        if start < 1 or start > len(lines) or end > len(lines):
+            return None
+        if end != -1 and end < start:
+            return None
+        selected = lines[start - 1 :] if end == -1 else lines[start - 1 : end]
+        numbered = "\n".join(
+            f"{number:6}\t{line}" for number, line in enumerate(selected, start=start)
+        )
+        return {**cached.result, "output": f"{cached.header}\n{numbered}\n"}
+
+    def store_view(self, path: str, result: Any, generation: int) -> bool:
+        """Cache a full-file view result fetched when the cache was at `generation`"""
+        if generation != self._generation:
+            return False  # Something changed while the view was in flight
+        if not isinstance(result, dict) or result.get("error"):
+            return False
+        if not isinstance(result.get("output"), str):
+            return False
+        parsed = parse_view(result["output"])
+        if parsed is None:
+            return False
+        header, lines = parsed
+        extra = {k: v for k, v in result.items() if k != "output"}
+        self._store(path, _CachedFile(header, lines, extra))
+        return True
+
+    def apply_edit(self, params: Any, result: Any, generation: int) -> None:
+        """Apply a successful edit to the cached copy, or forget the file"""
+        path = params.path
+        cached = self._files.get(path)
+        failed = not isinstance(result, dict) or result.get("error")
+        if failed or generation != self._generation or params.command == "undo_edit":
+            self.drop(path)
+            return
+
+        match params.command:
+            case "create" if cached is not None:
+                cached.lines = (params.file_text or "").expandtabs().split("\n")
+                self._generation += 1
+            case "str_replace" if cached is not None:
+                content = "\n".join(cached.lines)
+                old = (params.old_str or "").expandtabs()
+                new = (params.new_str or "").expandtabs()
+                if not old or content.count(old) != 1:
+                    self.drop(path)
+                    return
+                cached.lines = content.replace(old, new).split("\n")
+                self._generation += 1
+            case "insert" if cached is not None:
+                line = params.insert_line
+                if line is None or line < 0 or line > len(cached.lines):
+                    self.drop(path)
+                    return
+                new_lines = (params.new_str or "").expandtabs().split("\n")
+                cached.lines[line:line] = new_lines
+                self._generation += 1
+            case _:
+                self.drop(path)
+
+    def _store(self, path: str, cached: _CachedFile) -> None:
+        self._files[path] = cached
+        self._files.move_to_end(path)
+        self._generation += 1
+        while len(self._files) > self.max_entries:
+            self._files.popitem(last=False)
@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
+
+ORCHESTRATOR_PRIORITY = 1
+WORKER_PRIORITY = 0
+
+
+class RateGovernor:
+    """Paces act requests to stay under the model provider's rate limits.
+
+    Requests and estimated tokens per minute are each tracked with a token bucket that
+    refills continuously and starts full, so short bursts are allowed. A request waits
+    until both buckets can cover it (and, with `max_concurrent`, until a slot is free).
+    Waiting requests are served by priority, then in arrival order, and a waiting
+    high-priority request is never overtaken. Share one governor between swarms that
+    use the same API key.
+
+    Args:
+        requests_per_minute (Optional[float]): Request budget, unlimited if None
+        tokens_per_minute (Optional[float]): Estimated token budget, unlimited if None
+        max_concurrent (Optional[int]): Maximum number of requests in flight
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrent: Optional[int] = None,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrent = max_concurrent
+        self._requests = requests_per_minute or 0.0  # Current bucket levels
+        self._tokens = tokens_per_minute or 0.0
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_queue_depth = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed, self._updated = now - self._updated, now
+        if self.requests_per_minute:
+            self._requests = min(
+                self.requests_per_minute,
+                self._requests + elapsed * self.requests_per_minute / 60,
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                self.tokens_per_minute,
+                self._tokens + elapsed * self.tokens_per_minute / 60,
+            )
+
+    def _delay(self, tokens: int) -> Optional[float]:
+        """Seconds until a request can go, None if it waits for a request to finish"""
+        if self.max_concurrent and self._in_flight >= self.max_concurrent:
+            return None
+        delay = 0.0
+        if self.requests_per_minute and self._requests < 1:
+            delay = (1 - self._requests) * 60 / self.requests_per_minute
+        if self.tokens_per_minute:
+            # A request larger than the whole budget goes once the bucket is full
+            needed = min(tokens, self.tokens_per_minute)
+            if self._tokens < needed:
+                delay = max(
+                    delay, (needed - self._tokens) * 60 / self.tokens_per_minute
+                )
+        return delay
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay(tokens)
+            if delay is None:
+                return  # `release` dispatches again
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(
+                    delay, self._dispatch
+                )
+                return
+            heapq.heappop(self._waiters)
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            self._in_flight += 1
+            future.set_result(None)
+
+    async def acquire(self, tokens: int = 0, priority: int = WORKER_PRIORITY) -> None:
+        """Wait until a request estimated at `tokens` may be sent.
+
+        Every acquire must be followed by a `release` once the request is done.
+
+        Args:
+            tokens (int): Estimated tokens of the request
+            priority (int): Requests with a higher priority are served first
+        """
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._order), tokens, future))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        started = time.monotonic()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(tokens)  # Granted just before being cancelled
+            raise
+        self.granted += 1
+        self.total_wait += time.monotonic() - started
+
+    def release(self, tokens: int = 0, used: Optional[int] = None) -> None:
+        """Mark a request as done, correcting its token estimate with the actual usage"""
+        self._in_flight -= 1
+        if used is not None and self.tokens_per_minute:
+            self._refill()
+            self._tokens = min(self.tokens_per_minute, self._tokens + tokens - used)
+        self._dispatch()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting"""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def stats(self) -> Dict[str, float]:
+        """Current queue depth per priority and totals since the governor was created"""
+        depths: Dict[str, float] = {}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                key = f"queue_depth_priority_{-priority}"
+                depths[key] = depths.get(key, 0) + 1
+        return {
+            "queue_depth": self.queue_depth,
+            **depths,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self._in_flight,
+            "granted": self.granted,
+            "average_wait": self.total_wait / self.granted if self.granted else 0.0,
+        }
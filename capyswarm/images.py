@@ -0,0 +1,106 @@
+import base64
+import hashlib
+import os
+from typing import Any, List, Optional, Set
+
+from scrapybara.types.act import ImagePart, Message, Step, TextPart, ToolResultPart
+
+
+class ImageStore:
+    """Keeps an agent's screenshots from piling up in its messages and steps.
+
+    Images are identified by a hash of their content. Walking the history from newest
+    to oldest, the first `keep_last` distinct images stay inline. Every other occurrence
+    is replaced by a short reference, so repeated screenshots and old ones cost neither
+    memory nor upload size. With a `spill_dir`, referenced images are written to disk
+    once and can be loaded back with `load`.
+
+    Args:
+        keep_last (int): Number of most recent distinct images kept inline
+        spill_dir (Optional[str]): Directory to write referenced images to
+    """
+
+    def __init__(self, keep_last: int = 2, spill_dir: Optional[str] = None):
+        self.keep_last = keep_last
+        self.spill_dir = spill_dir
+        self._spilled: Set[str] = set()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @staticmethod
+    def digest(image: str) -> str:
+        """Content hash used to reference an image"""
+        return hashlib.sha256(image.encode()).hexdigest()[:16]
+
+    def _path(self, ref: str) -> str:
+        return os.path.join(self.spill_dir, f"{ref}.png")
+
+    def _spill(self, ref: str, image: str) -> None:
+        if not self.spill_dir or ref in self._spilled:
+            return
+        if not os.path.exists(self._path(ref)):
+            with open(self._path(ref), "wb") as f:
+                f.write(base64.b64decode(image))
+        self._spilled.add(ref)
+
+    def load(self, ref: str) -> Optional[str]:
+        """Load a referenced image back as base64, if it was spilled to disk"""
+        if not self.spill_dir or not os.path.exists(self._path(ref)):
+            return None
+        with open(self._path(ref), "rb") as f:
+            return base64.b64encode(f.read()).decode()
+
+    def _replace(self, image: str, inline: List[str]) -> Optional[str]:
+        """Return the reference to use for an image, or None to keep it inline"""
+        ref = self.digest(image)
+        if ref not in inline and len(inline) < self.keep_last:
+            inline.append(ref)
+            return None
+        self._spill(ref, image)
+        return ref
+
+    def _result(self, part: ToolResultPart, inline: List[str]) -> ToolResultPart:
+        result = part.result
+        if not isinstance(result, dict) or not result.get("base64_image"):
+            return part
+        ref = self._replace(result["base64_image"], inline)
+        if ref is None:
+            return part
+        # Like compaction, drop the image key so nothing treats the result as an image
+        rest = {k: v for k, v in result.items() if k != "base64_image"}
+        return part.model_copy(update={"result": {**rest, "image_ref": ref}})
+
+    def apply(self, messages: List[Message]) -> List[Message]:
+        """Return the messages with all but the newest images replaced by references"""
+        inline: List[str] = []
+        applied: List[Message] = []
+        for message in reversed(messages):
+            content: List[Any] = []
+            for part in reversed(message.content):
+                if isinstance(part, ImagePart):
+                    ref = self._replace(part.image, inline)
+                    if ref is not None:
+                        part = TextPart(text=f"[image {ref}]")
+                elif isinstance(part, ToolResultPart):
+                    part = self._result(part, inline)
+                content.append(part)
+            content.reverse()
+            if any(new is not old for new, old in zip(content, message.content)):
+                message = message.model_copy(update={"content": content})
+            applied.append(message)
+        applied.reverse()
+        return applied
+
+    def apply_steps(self, steps: List[Step]) -> List[Step]:
+        """Return the steps with all but the newest images replaced by references"""
+        inline: List[str] = []
+        applied: List[Step] = []
+        for step in reversed(steps):
+            if step.tool_results:
+                results = [self._result(r, inline) for r in reversed(step.tool_results)]
+                results.reverse()
+                if any(new is not old for new, old in zip(results, step.tool_results)):
+                    step = step.model_copy(update={"tool_results": results})
+            applied.append(step)
+        applied.reverse()
+        return applied
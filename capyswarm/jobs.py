@@ -0,0 +1,205 @@
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+from scrapybara.types.act import Message
+
+from .core import Swarm
+from .pool import SwarmInstancePool
+from .types import Agent, TaskResult
+
+
+class SwarmJob(BaseModel):
+    """One prompt run by a `SwarmJobRunner`, and its outcome.
+
+    Attributes:
+        job_id (str): ID of the job within its runner
+        prompt (str): The task description
+        messages (Optional[List[Message]]): Initial messages for context
+        run_id (Optional[str]): ID of the swarm run, for checkpoints
+        report (Optional[str]): The final report, once the job has finished
+        task_results (Dict[str, TaskResult]): Outcome of each task of the run
+        error (Optional[str]): Why the job failed, if it did
+        queued_at (float): When the job was submitted
+        started_at (Optional[float]): When the job got a slot and started running
+        finished_at (Optional[float]): When the job finished
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    job_id: str
+    prompt: str
+    messages: Optional[List[Message]] = None
+    run_id: Optional[str] = None
+    report: Optional[str] = None
+    task_results: Dict[str, TaskResult] = {}
+    error: Optional[str] = None
+    queued_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class SwarmJobRunner:
+    """Runs many prompts concurrently with the same set of agents.
+
+    Each job gets its own `Swarm` over clones of the agents, so jobs never share a
+    history, an orchestrator session or task results. All swarms provision from one
+    instance pool. The default pool keeps fresh instances warm and stops the ones a
+    job used, so no job sees another job's files or screen. At
+    most `max_concurrent` jobs run at a time, the rest wait in submission order.
+    Instances attached to by ID are shared by the jobs that use them, and stopped once
+    the last running job using them has finished (unless `detach_adopted` is passed).
+
+    Args:
+        agents (List[Agent]): Agent definitions, must include exactly one orchestrator.
+            They are cloned for every job and never run themselves
+        api_key (Optional[str]): Scrapybara API key, used if no pool is given
+        pool (Optional[SwarmInstancePool]): Instance pool shared by all jobs, by default
+            one that keeps a fresh instance warm per concurrent job
+        max_concurrent (int): Maximum number of jobs running at the same time
+        **swarm_kwargs: Other `Swarm` options, e.g. tool_limits or plan_cache
+    """
+
+    def __init__(
+        self,
+        agents: List[Agent],
+        api_key: Optional[str] = None,
+        pool: Optional[SwarmInstancePool] = None,
+        max_concurrent: int = 4,
+        **swarm_kwargs: Any,
+    ):
+        if sum(1 for agent in agents if agent.orchestrator) != 1:
+            raise ValueError("Swarm requires exactly one orchestrator agent")
+        self.agents = agents
+        self.max_concurrent = max_concurrent
+        self.detach_adopted = swarm_kwargs.pop("detach_adopted", False)
+        self.swarm_kwargs = swarm_kwargs
+        self.pool = pool or SwarmInstancePool(
+            api_key=api_key, warm=self._warm_target(), reuse=False
+        )
+        self._owns_pool = pool is None
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._ids = itertools.count(1)
+        self.jobs: Dict[str, SwarmJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Instances attached to by ID: running jobs using each, and the instance itself
+        self._adopted_users: Dict[str, int] = {}
+        self._adopted: Dict[str, Any] = {}
+
+    def _warm_target(self) -> Dict[str, int]:
+        # Agents on the "shared" instance use the type of the first one provisioned,
+        # the orchestrator goes first
+        ordered = sorted(self.agents, key=lambda agent: not agent.orchestrator)
+        shared = next((a for a in ordered if a.instance == "shared"), None)
+        return {shared.instance_type: self.max_concurrent} if shared else {}
+
+    async def __aenter__(self):
+        if self._owns_pool:
+            await self.pool.warm_up()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Cancel unfinished jobs and stop the pool's instances"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        if self._owns_pool:
+            await self.pool.close()
+
+    @property
+    def queued(self) -> int:
+        """Number of submitted jobs waiting for a slot"""
+        return sum(1 for job in self.jobs.values() if job.started_at is None)
+
+    @property
+    def running(self) -> int:
+        """Number of jobs currently running"""
+        return sum(
+            1
+            for job in self.jobs.values()
+            if job.started_at is not None and job.finished_at is None
+        )
+
+    def submit(
+        self, prompt: str, messages: Optional[List[Message]] = None
+    ) -> asyncio.Task:
+        """Queue a prompt to run as soon as a slot is free.
+
+        Returns:
+            asyncio.Task: Resolves to the finished SwarmJob, which reports failures in
+                `error` instead of raising
+        """
+        job = SwarmJob(
+            job_id=f"job-{next(self._ids)}",
+            prompt=prompt,
+            messages=messages,
+            queued_at=time.time(),
+        )
+        self.jobs[job.job_id] = job
+        task = asyncio.create_task(self._run_job(job))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+        return task
+
+    async def run_all(self, prompts: Iterable[str]) -> List[SwarmJob]:
+        """Run every prompt and wait for all of them, returning jobs in prompt order"""
+        return list(await asyncio.gather(*(self.submit(p) for p in prompts)))
+
+    async def _run_job(self, job: SwarmJob) -> SwarmJob:
+        async with self._slots:
+            job.started_at = time.time()
+            # One job finishing must not stop an instance other jobs still use, so
+            # swarms leave adopted instances running and the runner stops them
+            swarm = Swarm(
+                [agent.clone() for agent in self.agents],
+                pool=self.pool,
+                detach_adopted=True,
+                **self.swarm_kwargs,
+            )
+            adopted_ids = {a.instance for a in self.agents if a.instance != "shared"}
+            for instance_id in adopted_ids:
+                self._adopted_users[instance_id] = (
+                    self._adopted_users.get(instance_id, 0) + 1
+                )
+            try:
+                async with swarm:
+                    try:
+                        job.report = await swarm.run(job.prompt, job.messages)
+                    finally:
+                        for key, instance in swarm.instances.items():
+                            if not self.pool.started(instance):
+                                self._adopted[key] = instance
+            except Exception as e:
+                print(f"Error running {job.job_id}: {e}")
+                job.error = str(e) or type(e).__name__
+            finally:
+                await self._release_adopted(adopted_ids)
+            job.run_id = swarm.run_id
+            job.task_results = swarm.task_results
+            job.finished_at = time.time()
+        return job
+
+    async def _release_adopted(self, instance_ids: Iterable[str]) -> None:
+        """Stop the adopted instances no running job uses anymore"""
+        unused = []
+        for instance_id in instance_ids:
+            self._adopted_users[instance_id] -= 1
+            if self._adopted_users[instance_id] == 0:
+                del self._adopted_users[instance_id]
+                instance = self._adopted.pop(instance_id, None)
+                if instance is not None and not self.detach_adopted:
+                    unused.append(instance)
+        results = await asyncio.gather(
+            *(self._stop(instance) for instance in unused), return_exceptions=True
+        )
+        for instance, result in zip(unused, results):
+            if isinstance(result, BaseException):
+                print(f"Error stopping instance {instance.id}: {result}")
+
+    async def _stop(self, instance: Any) -> None:
+        # Only Ubuntu instances run a separate browser
+        if hasattr(instance, "browser"):
+            await instance.browser.stop()
+        await instance.stop()
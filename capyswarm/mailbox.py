@@ -0,0 +1,117 @@
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+from pydantic import BaseModel
+from scrapybara.types.act import Step, TextPart, UserMessage
+
+from .events import Communication
+from .prompts import get_mailbox_prompt
+
+
+class MailboxReplySchema(BaseModel):
+    """The orchestrator's replies to a batch of agent messages"""
+
+    class Reply(BaseModel):
+        agent_name: str  # The agent this reply is addressed to
+        message: str  # The reply content
+
+    replies: List[Reply]
+
+
+class OrchestratorMailbox:
+    """Collects messages sent to the orchestrator and answers them in combined turns.
+
+    A message sent while no turn is running starts one right away, messages that
+    arrive while a turn is running are delivered together in the next one. A `window`
+    additionally waits that many seconds for more messages before each turn. When more
+    than one agent is waiting, the orchestrator answers with a `MailboxReplySchema` and
+    each agent receives its own reply.
+
+    Args:
+        swarm (Any): The swarm whose orchestrator receives the messages
+        window (float): Seconds to wait for more messages before starting a turn
+    """
+
+    def __init__(self, swarm: Any, window: float = 0):
+        self._swarm = swarm
+        self.window = window
+        self._pending: List[Tuple[Any, str, asyncio.Future]] = []
+        self._delivery: Optional[asyncio.Task] = None
+
+    async def send(self, agent: Any, message: str) -> Tuple[str, List[Step]]:
+        """Send a message to the orchestrator and wait for its reply.
+
+        Returns:
+            Tuple[str, List[Step]]: The reply addressed to the agent and the steps the
+                orchestrator took to produce it
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((agent, message, future))
+        if self._delivery is None:
+            self._delivery = asyncio.create_task(self._deliver())
+        reply, steps = await future
+        await self._swarm.emit(
+            Communication(agent_name=agent.name, message=message, reply=reply)
+        )
+        return reply, steps
+
+    async def _deliver(self) -> None:
+        try:
+            while self._pending:
+                # Also lets messages sent in the same pass of the event loop join
+                await asyncio.sleep(self.window)
+                batch, self._pending = self._pending, []
+                # Senders cancelled while waiting need no reply
+                batch = [entry for entry in batch if not entry[2].done()]
+                if batch:
+                    await self._answer(batch)
+        finally:
+            self._delivery = None
+
+    async def _answer(self, batch: List[Tuple[Any, str, asyncio.Future]]) -> None:
+        try:
+            replies = await self._orchestrator_turn(batch)
+        except Exception as e:
+            replies = e
+
+        for agent, _, future in batch:
+            if future.done():
+                continue
+            if isinstance(replies, Exception):
+                future.set_exception(replies)
+            else:
+                future.set_result(replies[agent.name])
+
+    async def _orchestrator_turn(self, batch: List[Tuple[Any, str, asyncio.Future]]):
+        agent_names = list(dict.fromkeys(agent.name for agent, _, _ in batch))
+
+        # Create message for orchestrator as a user message
+        parts = [
+            TextPart(type="text", text=f"[{agent.name}] {message}")
+            for agent, message, _ in batch
+        ]
+        if len(agent_names) > 1:
+            parts.append(TextPart(type="text", text=get_mailbox_prompt(agent_names)))
+
+        # Don't print the orchestrator's response before the agents' messages
+        response = await self._swarm.session.turn(
+            [UserMessage(content=parts)],
+            schema=MailboxReplySchema if len(agent_names) > 1 else None,
+            on_step=None,
+        )
+
+        if not response:
+            raise ValueError("Failed to get response from orchestrator")
+
+        if len(agent_names) == 1:
+            return {agent_names[0]: (response.text, response.steps)}
+
+        # Keep the orchestrator's intermediate steps, but show each agent only its reply
+        texts = {name: response.text or "" for name in agent_names}
+        for reply in response.output.replies:
+            if reply.agent_name in texts:
+                texts[reply.agent_name] = reply.message
+        return {
+            name: (text, response.steps[:-1] + [Step(text=text)])
+            for name, text in texts.items()
+        }
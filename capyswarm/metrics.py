@@ -0,0 +1,153 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr
+from scrapybara.types.act import TokenUsage
+
+
+class TimingStats(BaseModel):
+    """Count and duration of a kind of operation"""
+
+    count: int = 0
+    total: float = 0.0  # Seconds
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+@contextmanager
+def span(
+    tracer: Optional[Any],
+    name: str,
+    stats: Optional[TimingStats] = None,
+    **attributes: Any,
+) -> Iterator[None]:
+    """Time a block into `stats`, and trace it as a span if a tracer is given.
+
+    The tracer can be anything with OpenTelemetry's `start_as_current_span`, e.g.
+    `opentelemetry.trace.get_tracer("capyswarm")`.
+    """
+    started = time.perf_counter()
+    with (
+        tracer.start_as_current_span(name, attributes=attributes)
+        if tracer is not None
+        else nullcontext()
+    ):
+        try:
+            yield
+        finally:
+            if stats is not None:
+                stats.add(time.perf_counter() - started)
+
+
+class AgentMetrics(BaseModel):
+    """Where an agent's time and tokens went.
+
+    Attributes:
+        tasks (TimingStats): Assignments, from start to finish
+        dependency_wait (TimingStats): Waiting for the tasks an assignment depends on,
+            or for the priority levels above it, from the start of the plan
+        task_wait (TimingStats): Waiting for the agent's previous task to finish
+        requests (TimingStats): Act requests to the model, including retries
+        request_wait (TimingStats): Waiting for the rate governor
+        tools (Dict[str, TimingStats]): Tool calls by tool name
+        tool_wait (TimingStats): Waiting for a tool limit slot
+        prompt_tokens (int): Input tokens reported by the model
+        completion_tokens (int): Output tokens reported by the model
+    """
+
+    name: str
+    tasks: TimingStats = Field(default_factory=TimingStats)
+    dependency_wait: TimingStats = Field(default_factory=TimingStats)
+    task_wait: TimingStats = Field(default_factory=TimingStats)
+    requests: TimingStats = Field(default_factory=TimingStats)
+    request_wait: TimingStats = Field(default_factory=TimingStats)
+    tools: Dict[str, TimingStats] = Field(default_factory=dict)
+    tool_wait: TimingStats = Field(default_factory=TimingStats)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    _tracer: Optional[Any] = PrivateAttr(default=None)
+
+    def span(self, name: str, stats: TimingStats, **attributes: Any):
+        return span(self._tracer, name, stats, agent=self.name, **attributes)
+
+    def tool(self, tool_name: str) -> TimingStats:
+        return self.tools.setdefault(tool_name, TimingStats())
+
+    def add_usage(self, usage: Optional[TokenUsage]) -> None:
+        if usage:
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens
+
+
+class SwarmMetrics:
+    """Timings and token usage of a swarm, per agent and per tool.
+
+    Args:
+        tracer (Optional[Any]): OpenTelemetry-style tracer, every timed operation is
+            also recorded as a span
+    """
+
+    def __init__(self, tracer: Optional[Any] = None):
+        self.tracer = tracer
+        self.agents: Dict[str, AgentMetrics] = {}
+        self.provisioning: Dict[str, TimingStats] = {}  # By instance type
+        self.phases: Dict[str, TimingStats] = {}  # planning, execution, report
+
+    def agent(self, name: str) -> AgentMetrics:
+        if name not in self.agents:
+            self.agents[name] = AgentMetrics(name=name)
+            self.agents[name]._tracer = self.tracer
+        return self.agents[name]
+
+    def span(self, name: str, stats: Optional[TimingStats] = None, **attributes):
+        return span(self.tracer, name, stats, **attributes)
+
+    def phase(self, name: str):
+        """Time a phase of a run"""
+        stats = self.phases.setdefault(name, TimingStats())
+        return self.span(f"swarm.{name}", stats)
+
+    def provision(self, instance_type: str):
+        """Time starting or finding an instance"""
+        stats = self.provisioning.setdefault(instance_type, TimingStats())
+        return self.span("swarm.provision", stats, instance_type=instance_type)
+
+    def reset(self) -> None:
+        self.agents.clear()
+        self.provisioning.clear()
+        self.phases.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        """All metrics as plain data, e.g. to log as JSON"""
+        return {
+            "phases": {k: v.model_dump() for k, v in self.phases.items()},
+            "provisioning": {k: v.model_dump() for k, v in self.provisioning.items()},
+            "agents": {k: v.model_dump() for k, v in self.agents.items()},
+        }
+
+    def render(self) -> str:
+        """A table of where each agent spent its time"""
+        lines = [
+            f"{'agent':<20}{'tasks':>8}{'deps s':>9}{'llm s':>9}{'tools s':>9}"
+            f"{'wait s':>9}{'tokens in':>11}{'tokens out':>11}"
+        ]
+        for name, m in self.agents.items():
+            tools = sum(t.total for t in m.tools.values())
+            wait = m.task_wait.total + m.request_wait.total + m.tool_wait.total
+            lines.append(
+                f"{name[:19]:<20}{m.tasks.count:>8}{m.dependency_wait.total:>9.2f}"
+                f"{m.requests.total:>9.2f}{tools:>9.2f}{wait:>9.2f}"
+                f"{m.prompt_tokens:>11}{m.completion_tokens:>11}"
+            )
+        for name, stats in self.provisioning.items():
+            lines.append(f"provision {name}: {stats.count} in {stats.total:.2f}s")
+        return "\n".join(lines)
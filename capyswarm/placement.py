@@ -0,0 +1,158 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+EXCLUSIVE = "exclusive"
+SHARED = "shared"
+# Tools that drive an instance. Others (communicate, inspect_agent, ...) are never
+# held back, an agent waiting on the orchestrator must not keep its instance busy.
+DEFAULT_MODES = {
+    "computer": EXCLUSIVE,
+    "bash": SHARED,
+    "str_replace_editor": SHARED,
+}
+
+
+class _InstanceQueue:
+    def __init__(self):
+        self.holders: Dict[str, int] = {}  # Agent name -> calls in progress
+        self.exclusive: Optional[str] = None  # Agent using the screen
+        self.waiters: Dict[str, Deque[Tuple[str, asyncio.Future]]] = {}
+        self.turns: Deque[str] = deque()  # Agents with waiting calls, in serving order
+
+
+class PlacementScheduler:
+    """Coordinates the agents that use the same instance.
+
+    GUI actions get the instance to themselves, so two agents never move the same mouse
+    at once. Bash and file edits can run alongside each other, for at most `capacity`
+    agents at a time. Waiting calls are served round-robin between agents, and a call
+    that cannot start yet is never overtaken, so a GUI action is not starved by a stream
+    of bash calls. Share one scheduler between swarms that use the same instances.
+
+    With `spread`, an agent whose instance is busy with another agent's task when its
+    own task starts moves to an instance of its own from the pool, and keeps it until the
+    swarm exits. The `Agent` itself is not changed. Only use it for agents that do not
+    need to see each other's screen.
+
+    Args:
+        capacity (int): Maximum number of agents using an instance at the same time
+        modes (Optional[Dict[str, str]]): "exclusive" or "shared" per tool name, tools
+            not listed run without coordination. Defaults to exclusive `computer` and
+            shared `bash` and `str_replace_editor`
+        spread (bool): Move agents running in parallel onto separate instances
+    """
+
+    def __init__(
+        self,
+        capacity: int = 4,
+        modes: Optional[Dict[str, str]] = None,
+        spread: bool = False,
+    ):
+        self.capacity = capacity
+        self.modes = DEFAULT_MODES if modes is None else modes
+        self.spread = spread
+        self._queues: Dict[str, _InstanceQueue] = {}
+
+        # Metrics
+        self.granted = 0
+        self.total_wait = 0.0
+
+    @asynccontextmanager
+    async def use(
+        self, instance_id: str, agent_name: str, tool_name: str
+    ) -> AsyncIterator[None]:
+        """Hold the instance for one tool call of an agent"""
+        mode = self.modes.get(tool_name)
+        if mode is None:
+            yield
+            return
+        await self.acquire(instance_id, agent_name, mode)
+        try:
+            yield
+        finally:
+            self.release(instance_id, agent_name)
+
+    def _fits(self, queue: _InstanceQueue, agent_name: str, mode: str) -> bool:
+        if mode == EXCLUSIVE:
+            return not queue.holders
+        if queue.exclusive is not None:
+            return False
+        return agent_name in queue.holders or len(queue.holders) < self.capacity
+
+    def _grant(self, queue: _InstanceQueue, agent_name: str, mode: str) -> None:
+        queue.holders[agent_name] = queue.holders.get(agent_name, 0) + 1
+        if mode == EXCLUSIVE:
+            queue.exclusive = agent_name
+
+    def _dispatch(self, queue: _InstanceQueue) -> None:
+        while queue.turns:
+            agent_name = queue.turns[0]
+            waiting = queue.waiters[agent_name]
+            while waiting and waiting[0][1].done():  # Cancelled while waiting
+                waiting.popleft()
+            if not waiting:
+                queue.turns.popleft()
+                del queue.waiters[agent_name]
+                continue
+            mode, future = waiting[0]
+            if not self._fits(queue, agent_name, mode):
+                return  # Nobody overtakes, `release` dispatches again
+            waiting.popleft()
+            self._grant(queue, agent_name, mode)
+            future.set_result(None)
+            queue.turns.rotate(-1)  # Next agent's turn
+
+    async def acquire(self, instance_id: str, agent_name: str, mode: str) -> None:
+        """Wait until the agent may use the instance in the given mode.
+
+        Every acquire must be followed by a `release` once the call is done.
+        """
+        queue = self._queues.setdefault(instance_id, _InstanceQueue())
+        if not queue.turns and self._fits(queue, agent_name, mode):
+            self._grant(queue, agent_name, mode)
+            self.granted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        if agent_name not in queue.waiters:
+            queue.waiters[agent_name] = deque()
+            queue.turns.append(agent_name)
+        queue.waiters[agent_name].append((mode, future))
+        self._dispatch(queue)
+        started = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(instance_id, agent_name)  # Granted just before
+            else:
+                self._dispatch(queue)  # It may have been the one holding others up
+            raise
+        self.granted += 1
+        self.total_wait += time.monotonic() - started
+
+    def release(self, instance_id: str, agent_name: str) -> None:
+        queue = self._queues[instance_id]
+        queue.holders[agent_name] -= 1
+        if not queue.holders[agent_name]:
+            del queue.holders[agent_name]
+            if queue.exclusive == agent_name:
+                queue.exclusive = None
+        self._dispatch(queue)
+
+    def stats(self) -> Dict[str, float]:
+        """Calls waiting and in progress per instance, and totals"""
+        stats: Dict[str, float] = {}
+        for instance_id, queue in self._queues.items():
+            stats[f"{instance_id}_waiting"] = sum(
+                1 for w in queue.waiters.values() for _, f in w if not f.done()
+            )
+            stats[f"{instance_id}_agents"] = len(queue.holders)
+        return {
+            **stats,
+            "granted": self.granted,
+            "average_wait": self.total_wait / self.granted if self.granted else 0.0,
+        }
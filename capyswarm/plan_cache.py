@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from scrapybara.types.act import Message
+
+from .tools import OrchestratorSchema
+
+
+def plan_key(
+    prompt: str, agents: List[Any], messages: Optional[List[Message]] = None
+) -> str:
+    """Hash of everything the orchestrator's plan depends on.
+
+    That is the prompt, any initial messages, the orchestrator's model and each
+    agent's name, system prompt (which includes its role) and instance type.
+    """
+    orchestrator = next(agent for agent in agents if agent.orchestrator)
+    data = {
+        "prompt": prompt,
+        "messages": [m.model_dump(mode="json") for m in messages or []],
+        "model": [orchestrator.model.provider, orchestrator.model.name],
+        "agents": [
+            [agent.name, agent.system, agent.instance_type]
+            for agent in agents
+            if not agent.orchestrator
+        ],
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class PlanCache:
+    """Remembers the orchestrator's plans so identical runs can skip planning.
+
+    Entries expire after `ttl` seconds, and the least recently used entry is evicted
+    once there are more than `max_entries`. With a `path`, the cache is kept in a JSON
+    file so it survives between processes (e.g. scheduled jobs).
+
+    Args:
+        ttl (float): Seconds a plan stays valid
+        max_entries (int): Maximum number of plans kept
+        path (Optional[str]): JSON file to load the cache from and save it to
+    """
+
+    def __init__(
+        self, ttl: float = 3600, max_entries: int = 128, path: Optional[str] = None
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[float, OrchestratorSchema]] = (
+            OrderedDict()
+        )
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for key, (created, plan) in json.load(f).items():
+                    self._entries[key] = (
+                        created,
+                        OrchestratorSchema.model_validate(plan),
+                    )
+
+    def get(self, key: str) -> Optional[OrchestratorSchema]:
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, plan: OrchestratorSchema) -> None:
+        self._entries[key] = (time.time(), plan)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.path:
+            self._save()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.path:
+            self._save()
+
+    def _save(self) -> None:
+        data = {
+            key: [created, plan.model_dump(mode="json")]
+            for key, (created, plan) in self._entries.items()
+        }
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(f"{self.path}.tmp", self.path)
@@ -0,0 +1,158 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from scrapybara import AsyncScrapybara
+
+
+class SwarmInstancePool:
+    """Provisions Scrapybara instances and keeps pre-warmed ones around for reuse.
+
+    A pool can be shared between several `Swarm`s (and several runs of one swarm) so
+    that instances started by one are handed to the next instead of cold-starting.
+
+    Args:
+        client (Optional[AsyncScrapybara]): Client used to start and list instances
+        api_key (Optional[str]): Scrapybara API key, used if no client is given
+        warm (Optional[Dict[str, int]]): Pre-warmed instances to keep per instance type,
+            e.g. {"ubuntu": 2, "browser": 1}
+        timeout_hours (float): Timeout for newly started instances
+        reuse (bool): Keep instances released by a swarm warm for the next one. Turn
+            off when every swarm needs clean instances, released ones are then stopped
+            and only instances that were never handed out are reused
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncScrapybara] = None,
+        api_key: Optional[str] = None,
+        warm: Optional[Dict[str, int]] = None,
+        timeout_hours: float = 1,
+        reuse: bool = True,
+    ):
+        self.client = client or AsyncScrapybara(api_key=api_key)
+        self.warm = warm or {}
+        self.timeout_hours = timeout_hours
+        self.reuse = reuse
+        self._idle: Dict[str, List[Any]] = {}  # Warm instances by instance type
+        self._types: Dict[str, str] = {}  # Instance type of every instance we started
+        self._refills: Dict[str, asyncio.Task] = {}
+        self._listing: Optional[Dict[str, Any]] = None
+        self._listing_lock = asyncio.Lock()
+        self._closed = False
+
+    async def __aenter__(self):
+        await self.warm_up()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def started(self, instance: Any) -> bool:
+        """Whether the instance was started by this pool (as opposed to adopted)"""
+        return instance.id in self._types
+
+    async def _start(self, instance_type: str) -> Any:
+        match instance_type:
+            case "ubuntu":
+                instance = await self.client.start_ubuntu(
+                    timeout_hours=self.timeout_hours
+                )
+            case "windows":
+                instance = await self.client.start_windows(
+                    timeout_hours=self.timeout_hours
+                )
+            case "browser":
+                instance = await self.client.start_browser(
+                    timeout_hours=self.timeout_hours
+                )
+            case _:
+                raise ValueError(f"Unknown instance type {instance_type}")
+        self._types[instance.id] = instance_type
+        return instance
+
+    async def _fill(self, instance_type: str) -> None:
+        missing = self.warm.get(instance_type, 0) - len(
+            self._idle.get(instance_type, [])
+        )
+        if missing <= 0:
+            return
+        started = await asyncio.gather(
+            *(self._start(instance_type) for _ in range(missing)),
+            return_exceptions=True,
+        )
+        for instance in started:
+            if isinstance(instance, BaseException):
+                print(f"Failed to pre-warm {instance_type} instance: {instance}")
+            elif self._closed:  # Closed while starting, nobody will take it
+                await self._stop([instance])
+            else:
+                self._idle.setdefault(instance_type, []).append(instance)
+
+    def _schedule_refill(self, instance_type: str) -> None:
+        refill = self._refills.get(instance_type)
+        if self._closed or not self.warm.get(instance_type, 0):
+            return
+        if refill is None or refill.done():
+            self._refills[instance_type] = asyncio.create_task(
+                self._fill(instance_type)
+            )
+
+    async def warm_up(self) -> None:
+        """Start instances until every type has its configured number of warm instances"""
+        await asyncio.gather(*(self._fill(t) for t in self.warm))
+
+    def invalidate(self) -> None:
+        """Forget the cached instance listing so the next lookup fetches a fresh one"""
+        self._listing = None
+
+    async def find(self, instance_id: str) -> Optional[Any]:
+        """Look up a running instance by ID, listing instances at most once per refresh"""
+        if self._listing is None:
+            async with self._listing_lock:
+                if self._listing is None:
+                    self._listing = {
+                        inst.id: inst for inst in await self.client.get_instances()
+                    }
+        return self._listing.get(instance_id)
+
+    async def acquire(self, instance_type: str) -> Any:
+        """Take a warm instance of the given type, or start a new one if none is idle"""
+        idle = self._idle.get(instance_type)
+        if idle:
+            instance = idle.pop()
+            self._schedule_refill(instance_type)
+            return instance
+        instance = await self._start(instance_type)
+        self._schedule_refill(instance_type)
+        return instance
+
+    async def release(self, instance: Any) -> None:
+        """Return an instance started by this pool, stopping it if the pool is full"""
+        instance_type = self._types.get(instance.id)
+        idle = self._idle.get(instance_type, [])
+        full = len(idle) >= self.warm.get(instance_type, 0)
+        if instance_type and self.reuse and not full and not self._closed:
+            self._idle.setdefault(instance_type, []).append(instance)
+            return
+        self._types.pop(instance.id, None)
+        await instance.stop()
+
+    async def close(self) -> None:
+        """Stop every warm instance held by the pool"""
+        self._closed = True
+        # Cancelling a refill midway through `start_*` could leave an instance running
+        # that nobody knows about, so wait for them to put their instances in `_idle`
+        await asyncio.gather(*self._refills.values(), return_exceptions=True)
+        self._refills.clear()
+        idle = [inst for instances in self._idle.values() for inst in instances]
+        self._idle.clear()
+        await self._stop(idle)
+
+    async def _stop(self, instances: List[Any]) -> None:
+        results = await asyncio.gather(
+            *(inst.stop() for inst in instances), return_exceptions=True
+        )
+        for inst, result in zip(instances, results):
+            self._types.pop(inst.id, None)
+            if isinstance(result, BaseException):
+                print(f"Error stopping instance {inst.id}: {result}")
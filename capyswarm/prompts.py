@@ -135,6 +135,12 @@ You are the Orchestrator Agent, the central coordinator of a swarm of AI agents
   * Priority 2-4: Analysis tasks that depend on earlier results
   * Priority 1: Final aggregation or cleanup tasks
 
+- Explicit Dependencies (preferred when you know exactly what each task needs):
+  * Give each assignment a short unique `task_id` (e.g., "collect-posts")
+  * List the `task_id`s it needs in `depends_on` (e.g., ["collect-posts"]); use [] for no dependencies
+  * A task with `depends_on` starts as soon as those tasks finish, without waiting for unrelated tasks
+  * Leave `depends_on` unset to fall back to the priority ordering described above
+
 4. COMMUNICATION PROTOCOL
 When agents communicate with you, their messages will appear in this format:
 [Agent Name] Message content
@@ -161,6 +167,11 @@ You have access to the `inspect_agent` tool:
   * You need to verify task completion
   * You need to find specific information in an agent's history
   * You want to check an agent's current prompt/task
+- It returns a short summary of the agent's work and its most recent steps. Narrow it down with:
+  * `query`: only steps mentioning a keyword
+  * `tool_name`: only steps that called a specific tool
+  * `last_n`: only the agent's last N steps
+  * `cursor`: pass the returned `next_cursor` to page back to older steps
 
 6. DECISION MAKING
 - When handling agent communications, consider:
@@ -184,6 +195,7 @@ For each task, you must output a structured plan using the Orchestrator schema,
 - Specific task assignments for each agent, including:
   * The exact prompt/instructions
   * Priority level (considering dependencies and parallel execution)
+  * Optionally a task_id and the task_ids it depends_on
 - Any additional execution notes or coordination requirements
 
 IMPORTANT: End your turn:
@@ -192,3 +204,21 @@ IMPORTANT: End your turn:
 3. When you've provided the information or guidance an agent needs
 
 Remember: You are the orchestrator of the swarm. Your decisions should optimize for efficient task completion while maintaining clear communication and coordination between all agents."""
+
+
+def get_mailbox_prompt(agent_names: List[str]) -> str:
+    """Generate the instruction appended when several agents message the orchestrator at once"""
+    return f"""Several agents have messaged you at the same time: {", ".join(agent_names)}.
+Handle all of their messages in this turn, then end it by calling the `structured_output` tool with one reply per agent (agent_name and message)."""
+
+
+def get_reassignment_prompt(results: List) -> str:
+    """Generate the message telling the orchestrator which tasks did not complete"""
+    failures = "\n".join(
+        f"  - {r.task_id} ({r.agent_name}): {r.status}, {r.error}" for r in results
+    )
+    return f"""Some tasks did not complete:
+{failures}
+
+Use the Orchestrator schema to reassign the work that is still needed, for example to a different agent or with clearer instructions.
+Only include the tasks that need to run again. If nothing needs to be redone, return an empty list of task assignments."""
@@ -0,0 +1,46 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from scrapybara.core.api_error import ApiError
+
+T = TypeVar("T")
+
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error is worth retrying (rate limits, overloads, network failures)"""
+    if isinstance(error, ApiError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+async def with_retries(
+    call: Callable[[], Awaitable[T]],
+    max_retries: int = 2,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+) -> T:
+    """Await `call`, retrying transient errors with jittered exponential backoff.
+
+    Args:
+        call (Callable[[], Awaitable[T]]): Creates the awaitable to run on each attempt
+        max_retries (int): Number of retries after the first attempt
+        base_delay (float): Delay before the first retry, doubled on each retry
+        max_delay (float): Upper bound for a single delay
+
+    Returns:
+        T: The result of the first successful attempt
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= max_retries or not is_transient(e):
+                raise
+            delay = min(base_delay * 2**attempt, max_delay)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            attempt += 1
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Set
+
+from .tools import OrchestratorSchema
+
+TaskAssignment = OrchestratorSchema.TaskAssignment
+
+
+class TaskGraph:
+    """Dependency graph over the task assignments of an orchestrator plan.
+
+    Assignments that declare ``depends_on`` wait only for the listed tasks. Assignments
+    that leave it unset fall back to priority ordering and wait for every assignment in
+    the next higher priority level, which reproduces the old priority barriers.
+
+    Args:
+        assignments (List[TaskAssignment]): The assignments from the orchestrator's plan
+    """
+
+    def __init__(self, assignments: List[TaskAssignment]):
+        explicit: Set[str] = set()
+        for assignment in assignments:
+            if assignment.task_id in explicit:
+                raise ValueError(f"Duplicate task_id {assignment.task_id}")
+            if assignment.task_id:
+                explicit.add(assignment.task_id)
+
+        # Generated ids skip the ones the plan chose, so no assignment is shadowed
+        self.assignments: Dict[str, TaskAssignment] = {}
+        number = 0
+        for assignment in assignments:
+            if not assignment.task_id:
+                number += 1
+                while f"task-{number}" in explicit:
+                    number += 1
+                assignment.task_id = f"task-{number}"
+            self.assignments[assignment.task_id] = assignment
+
+        self.dependencies: Dict[str, Set[str]] = {}
+        for task_id, assignment in self.assignments.items():
+            if assignment.depends_on is None:
+                self.dependencies[task_id] = self._priority_dependencies(assignment)
+                continue
+            unknown = [d for d in assignment.depends_on if d not in self.assignments]
+            if unknown:
+                raise ValueError(
+                    f"Task {task_id} depends on unknown tasks: {', '.join(unknown)}"
+                )
+            self.dependencies[task_id] = set(assignment.depends_on) - {task_id}
+
+        self.dependents: Dict[str, Set[str]] = {t: set() for t in self.assignments}
+        for task_id, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents[dep].add(task_id)
+
+        self._check_acyclic()
+        # Seconds each started task spent waiting for its dependencies
+        self.dependency_wait: Dict[str, float] = {}
+
+    def _priority_dependencies(self, assignment: TaskAssignment) -> Set[str]:
+        """Depend on every task in the closest priority level above this one"""
+        higher = [
+            a.priority
+            for a in self.assignments.values()
+            if a.priority > assignment.priority
+        ]
+        if not higher:
+            return set()
+        closest = min(higher)
+        return {t for t, a in self.assignments.items() if a.priority == closest}
+
+    def _check_acyclic(self) -> None:
+        remaining = {t: len(deps) for t, deps in self.dependencies.items()}
+        ready = [t for t, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            task_id = ready.pop()
+            visited += 1
+            for dependent in self.dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if visited != len(self.assignments):
+            cycle = sorted(t for t, count in remaining.items() if count > 0)
+            raise ValueError(f"Task dependencies contain a cycle: {', '.join(cycle)}")
+
+    async def execute(
+        self, run_task: Callable[[TaskAssignment], Awaitable[object]]
+    ) -> Dict[str, object]:
+        """Run every assignment as soon as its dependencies have finished.
+
+        Tasks that become ready together are started in priority order (highest first).
+        A failed task still releases its dependents, matching the old barrier behavior.
+        How long each task waited to start is recorded in `dependency_wait`.
+
+        Args:
+            run_task (Callable): Coroutine function that executes one assignment
+
+        Returns:
+            Dict[str, object]: Result (or raised exception) of each task, keyed by task_id
+        """
+        waiting = {t: set(deps) for t, deps in self.dependencies.items()}
+        running: Dict[asyncio.Task, str] = {}
+        results: Dict[str, object] = {}
+        started = time.perf_counter()
+
+        def start_ready() -> None:
+            ready = [t for t, deps in waiting.items() if not deps]
+            ready.sort(key=lambda t: self.assignments[t].priority, reverse=True)
+            for task_id in ready:
+                del waiting[task_id]
+                self.dependency_wait[task_id] = time.perf_counter() - started
+                task = asyncio.create_task(run_task(self.assignments[task_id]))
+                running[task] = task_id
+
+        start_ready()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    task_id = running.pop(task)
+                    if task.cancelled():
+                        results[task_id] = asyncio.CancelledError()
+                    else:
+                        results[task_id] = task.exception() or task.result()
+                    for dependent in self.dependents[task_id]:
+                        waiting[dependent].discard(task_id)
+                start_ready()
+        finally:
+            for task in running:
+                task.cancel()
+
+        return results
@@ -0,0 +1,147 @@
+import asyncio
+import base64
+import io
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+UNCHANGED = "Screen unchanged since the last screenshot"
+
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError(
+            "Cropping, downscaling and tolerant comparison of screenshots require "
+            "Pillow: pip install 'capyswarm[images]'"
+        ) from None
+    return Image
+
+
+class ScreenshotThrottle:
+    """Cuts the screenshots an agent's computer tool sends to the model.
+
+    - Unchanged screens: when a capture is the same as the previous one the agent got
+      from the instance, the image is left out and the result says so instead. With a
+      `tolerance`, small differences (a blinking cursor, a clock) still count as the same
+    - Interval: a `screenshot` requested less than `min_interval` seconds after the
+      previous one waits, so polling loops capture less often
+    - Cropping and downscaling: images are cut to `region` and shrunk to `max_width`.
+      Coordinates in later actions are mapped back to the full screen, so the agent can
+      click on what it sees
+
+    Comparison without a tolerance works on the raw image and needs nothing else.
+    Cropping, downscaling and tolerance need Pillow (`pip install 'capyswarm[images]'`).
+
+    Args:
+        skip_unchanged (bool): Leave out images identical to the previous one
+        tolerance (float): Mean pixel difference (0 to 1) up to which two captures count
+            as the same, compared on small grayscale thumbnails
+        min_interval (float): Minimum seconds between two screenshot actions
+        max_width (Optional[int]): Downscale wider images to this width
+        region (Optional[Tuple[int, int, int, int]]): Crop images to (left, top, right,
+            bottom) in screen pixels
+    """
+
+    def __init__(
+        self,
+        skip_unchanged: bool = True,
+        tolerance: float = 0.0,
+        min_interval: float = 0.0,
+        max_width: Optional[int] = None,
+        region: Optional[Tuple[int, int, int, int]] = None,
+    ):
+        self.skip_unchanged = skip_unchanged
+        self.tolerance = tolerance
+        self.min_interval = min_interval
+        self.max_width = max_width
+        self.region = region
+        if tolerance > 0 or max_width or region:
+            _pillow()  # Fail when the throttle is created, not mid-run
+        self.unchanged = 0  # Images left out
+        self.bytes_saved = 0  # Base64 characters not sent to the model
+        # By instance ID: the previous capture, its time and how it was transformed
+        self._previous: Dict[str, Any] = {}
+        self._captured: Dict[str, float] = {}
+        self._scale: Dict[str, float] = {}
+
+    def clone(self) -> "ScreenshotThrottle":
+        """The same settings without any previous captures, for another agent"""
+        return ScreenshotThrottle(
+            skip_unchanged=self.skip_unchanged,
+            tolerance=self.tolerance,
+            min_interval=self.min_interval,
+            max_width=self.max_width,
+            region=self.region,
+        )
+
+    async def wait(self, instance_id: str) -> None:
+        """Wait until a screenshot of the instance may be taken"""
+        previous = self._captured.get(instance_id)
+        if previous is not None and self.min_interval > 0:
+            remaining = previous + self.min_interval - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        self._captured[instance_id] = time.monotonic()
+
+    def to_screen(
+        self, instance_id: str, coordinate: Optional[Sequence[int]]
+    ) -> Optional[Sequence[int]]:
+        """Map a coordinate on the agent's (cropped, scaled) image to the screen"""
+        if coordinate is None or len(coordinate) != 2:
+            return coordinate
+        scale = self._scale.get(instance_id, 1.0)
+        left, top = self.region[:2] if self.region else (0, 0)
+        x, y = coordinate
+        return (round(left + x / scale), round(top + y / scale))
+
+    def process(self, instance_id: str, result: Any) -> Any:
+        """Leave out, crop or downscale the image of a computer tool result"""
+        if not isinstance(result, dict) or not result.get("base64_image"):
+            return result
+        image = result["base64_image"]
+
+        if self.skip_unchanged:
+            fingerprint = self._fingerprint(image)
+            previous = self._previous.get(instance_id)
+            self._previous[instance_id] = fingerprint
+            if previous is not None and self._same(previous, fingerprint):
+                self.unchanged += 1
+                self.bytes_saved += len(image)
+                output = result.get("output")
+                result = {k: v for k, v in result.items() if k != "base64_image"}
+                result["output"] = f"{output}\n{UNCHANGED}" if output else UNCHANGED
+                return result
+
+        if self.region or self.max_width:
+            transformed = self._transform(instance_id, image)
+            self.bytes_saved += len(image) - len(transformed)
+            result = {**result, "base64_image": transformed}
+        return result
+
+    def _fingerprint(self, image: str) -> Any:
+        if self.tolerance <= 0:
+            return image
+        Image = _pillow()
+        with Image.open(io.BytesIO(base64.b64decode(image))) as img:
+            return img.convert("L").resize((64, 48)).tobytes()
+
+    def _same(self, a: Any, b: Any) -> bool:
+        if self.tolerance <= 0 or len(a) != len(b):
+            return a == b
+        difference = sum(abs(x - y) for x, y in zip(a, b)) / (255 * len(a))
+        return difference <= self.tolerance
+
+    def _transform(self, instance_id: str, image: str) -> str:
+        Image = _pillow()
+        with Image.open(io.BytesIO(base64.b64decode(image))) as img:
+            if self.region:
+                img = img.crop(self.region)
+            scale = 1.0
+            if self.max_width and img.width > self.max_width:
+                scale = self.max_width / img.width
+                img = img.resize((self.max_width, max(1, round(img.height * scale))))
+            self._scale[instance_id] = scale
+            buffer = io.BytesIO()
+            img.save(buffer, format="PNG", optimize=True)
+        return base64.b64encode(buffer.getvalue()).decode()
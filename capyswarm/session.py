@@ -0,0 +1,64 @@
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+from scrapybara.types.act import Message, TextPart, UserMessage
+
+
+class OrchestratorSession:
+    """Owns the orchestrator's conversation and runs its turns one at a time.
+
+    The history is an immutable tuple. Each turn works on a copy and only replaces the
+    history once the turn succeeds, so readers holding a snapshot never see a turn
+    half-applied and a failed turn leaves the history untouched.
+
+    Args:
+        swarm (Any): The swarm whose orchestrator this session drives
+    """
+
+    def __init__(self, swarm: Any):
+        self._swarm = swarm
+        self.agent = swarm.orchestrator
+        self._history: Tuple[Message, ...] = tuple(self.agent.messages or ())
+        self._lock = asyncio.Lock()
+
+    def snapshot(self) -> Tuple[Message, ...]:
+        """The orchestrator's current history, unaffected by later turns"""
+        return self._history
+
+    def reset(self, messages: Optional[List[Message]] = None) -> None:
+        """Start a new conversation from the given messages"""
+        self._history = tuple(messages or ())
+        self.agent.messages = list(self._history)
+
+    async def turn(
+        self,
+        messages: Optional[List[Message]] = None,
+        prompt: Optional[str] = None,
+        interactive: bool = False,
+        **act_kwargs: Any,
+    ) -> Optional[Any]:
+        """Run one orchestrator turn after appending the given messages and prompt.
+
+        Args:
+            messages (Optional[List[Message]]): Messages to add before the turn
+            prompt (Optional[str]): New instruction for the orchestrator
+            interactive (bool): Whether to open a browser stream
+            **act_kwargs: Overrides for the act call, e.g. schema or on_step
+
+        Returns:
+            Optional[ActResponse]: The orchestrator's response, None if the turn failed
+        """
+        async with self._lock:
+            history = list(self._history) + list(messages or [])
+            if prompt is not None:
+                self.agent.prompt = prompt
+                history.append(
+                    UserMessage(content=[TextPart(type="text", text=prompt)])
+                )
+
+            response = await self._swarm.run_agent_task(
+                self.agent, interactive, messages=history, **act_kwargs
+            )
+            if response:
+                self._history = tuple(response.messages)
+            return response
@@ -0,0 +1,354 @@
+import asyncio
+import shlex
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from .files import FileViewCache
+
+# Commands that only read the filesystem or environment. Commands that print
+# something different on every call (date, ps, top, ...) are left out on purpose.
+READ_ONLY_COMMANDS = frozenset(
+    {
+        "basename",
+        "cat",
+        "cut",
+        "df",
+        "diff",
+        "dirname",
+        "du",
+        "echo",
+        "egrep",
+        "fgrep",
+        "file",
+        "find",
+        "grep",
+        "head",
+        "ls",
+        "nl",
+        "pwd",
+        "readlink",
+        "realpath",
+        "rg",
+        "sort",
+        "stat",
+        "tail",
+        "tr",
+        "tree",
+        "uname",
+        "uniq",
+        "wc",
+        "which",
+        "whoami",
+    }
+)
+WRITING_OPTIONS = {
+    "find": {
+        "-delete",
+        "-exec",
+        "-execdir",
+        "-fls",
+        "-fprint",
+        "-fprint0",
+        "-fprintf",
+        "-ok",
+        "-okdir",
+    },
+    "sort": {"-o", "--output"},
+    "tail": {"-f", "-F", "--follow"},
+    "tree": {"-o"},
+}
+LIST_OPERATORS = {"|", "||", "&&", ";"}
+
+
+def _words(command: str) -> Optional[List[str]]:
+    """Shell words and operators of a command, None if it cannot be parsed"""
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    try:
+        return list(lexer)
+    except ValueError:
+        return None
+
+
+def _uses_option(word: str, option: str) -> bool:
+    """Whether a shell word passes an option, in any of the forms getopt accepts.
+
+    Short options also match when bundled or given their value in the same word
+    (`-ofile`, `-ro`), long ones when abbreviated or given `--opt=value`. Options
+    with a single dash and a long name, like find's, only match whole words.
+    """
+    if option.startswith("--"):
+        name = word.split("=", 1)[0]
+        return len(name) > 2 and option.startswith(name)
+    if len(option) == 2:
+        return word.startswith("-") and not word.startswith("--") and option[1] in word
+    return word == option
+
+
+def is_read_only(command: str) -> bool:
+    """Whether a command only reads state, so its result can be reused.
+
+    Errs on the side of False: every command of a pipeline or list must be a known
+    read-only one, and redirections, substitutions, variables, subshells and
+    background jobs are never read-only.
+    """
+    if any(c in command for c in "$`\n"):
+        return False
+    words = _words(command)
+    if not words:
+        return False
+    segment: List[str] = []
+    for word in words + [";"]:
+        if word in LIST_OPERATORS:
+            if not segment:
+                continue
+            name = segment[0]
+            if name not in READ_ONLY_COMMANDS:
+                return False
+            if any(
+                _uses_option(word, option)
+                for option in WRITING_OPTIONS.get(name, ())
+                for word in segment[1:]
+            ):
+                return False
+            segment = []
+        elif word and all(c in "();<>|&" for c in word):
+            return False  # Redirection, subshell or background job
+        else:
+            segment.append(word)
+    return True
+
+
+def _batchable(command: Optional[str]) -> bool:
+    """Whether a command can share a script with others without changing its meaning"""
+    if not command or command.rstrip().endswith("\\") or "<<" in command:
+        return False
+    return _words(command) is not None  # Unbalanced quotes would swallow the rest
+
+
+class BashCache:
+    """Results of read-only bash commands on one instance.
+
+    Args:
+        ttl (float): Seconds a result stays valid, bounds how stale a result can get
+            when files change outside of the swarm's tools (e.g. by a running server)
+        max_entries (int): Maximum number of results kept
+    """
+
+    def __init__(self, ttl: float = 30, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    def get(self, command: str) -> Optional[Any]:
+        entry = self._entries.get(command)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[command]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(command)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, command: str, result: Any) -> None:
+        self._entries[command] = (time.monotonic(), result)
+        self._entries.move_to_end(command)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class BashRunner:
+    """Runs the bash commands of every agent using one instance.
+
+    With a `batch_window`, commands queued within the window are sent together as one
+    script in a single remote call and their outputs split apart again. The agent loop
+    queues consecutive bash calls of a step at once, so a chain like `pwd`, `ls`,
+    `cat README.md` costs one round-trip. Commands still run one after another in the
+    same shell, in the order they were queued.
+
+    With a `cache_ttl`, results of read-only commands (see `is_read_only`) are reused.
+    Any other command, every write through the edit tool and every GUI action that may
+    change something (see `AsyncComputerTool`) clears the cache.
+
+    Args:
+        instance (Any): The Scrapybara instance
+        batch_window (Optional[float]): Seconds to collect commands into one remote
+            call, 0 only batches commands queued at the same time, None disables batching
+        cache_ttl (Optional[float]): Seconds to reuse read-only results, None disables
+            the cache
+        files (Optional[FileViewCache]): The edit tool's file cache for the instance,
+            cleared by every command that is not read-only and every GUI action
+    """
+
+    def __init__(
+        self,
+        instance: Any,
+        batch_window: Optional[float] = None,
+        cache_ttl: Optional[float] = None,
+        files: Optional[FileViewCache] = None,
+    ):
+        self._instance = instance
+        self.files = files
+        self.batch_window = batch_window
+        self.cache = BashCache(cache_ttl) if cache_ttl is not None else None
+        self.remote_calls = 0
+        self._queue: List[Tuple[Optional[str], bool, asyncio.Future]] = []
+        self._drain_task: Optional[asyncio.Task] = None
+        self._generation = 0  # Bumped on every invalidation
+
+    @property
+    def batched(self) -> bool:
+        return self.batch_window is not None
+
+    def invalidate(self) -> None:
+        """Forget cached bash results, after something may have changed the instance"""
+        self._generation += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+    def forget(self) -> None:
+        """Forget cached bash results and file views, after any file may have changed"""
+        self.invalidate()
+        if self.files is not None:
+            self.files.clear()
+
+    async def run(self, command: Optional[str] = None, restart: bool = False) -> Any:
+        if restart or not command or not is_read_only(command):
+            self.forget()
+            try:
+                return await self._execute(command, restart)
+            finally:
+                # Reads that overlapped with this command must not be cached
+                self.forget()
+        if self.cache is None:
+            return await self._execute(command, restart)
+
+        cached = self.cache.get(command)
+        if cached is not None:
+            return dict(cached) if isinstance(cached, dict) else cached
+        generation = self._generation
+        result = await self._execute(command, restart)
+        if generation == self._generation:
+            self.cache.put(command, result)
+        return result
+
+    async def _execute(self, command: Optional[str], restart: bool) -> Any:
+        if not self.batched:
+            self.remote_calls += 1
+            return await self._instance.bash(command=command, restart=restart)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((command, restart, future))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        # Also lets the commands queued in the same pass of the event loop join
+        await asyncio.sleep(self.batch_window)
+        while self._queue:
+            queued, self._queue = self._queue, []
+            group: List[Tuple[str, asyncio.Future]] = []
+            for command, restart, future in queued:
+                if future.done():  # Timed out or cancelled while queued
+                    continue
+                if not restart and _batchable(command):
+                    group.append((command, future))
+                    continue
+                await self._send(group)
+                group = []
+                await self._send_one(command, restart, future)
+            await self._send(group)
+
+    async def _send_one(
+        self, command: Optional[str], restart: bool, future: asyncio.Future
+    ) -> None:
+        self.remote_calls += 1
+        try:
+            result = await self._instance.bash(command=command, restart=restart)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def _send(self, group: List[Tuple[str, asyncio.Future]]) -> None:
+        """Run commands as one script, giving each its own share of the output"""
+        if len(group) == 1:
+            await self._send_one(group[0][0], False, group[0][1])
+        if len(group) <= 1:
+            return
+
+        token = uuid.uuid4().hex[:12]
+        markers = [f"__capyswarm_{token}_{i}__" for i in range(len(group))]
+        script = "\n".join(
+            f"{command}\nprintf '\\n%s\\n' {marker}; printf '\\n%s\\n' {marker} >&2"
+            for (command, _), marker in zip(group, markers)
+        )
+        self.remote_calls += 1
+        try:
+            result = await self._instance.bash(command=script)
+        except Exception as e:
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        complete = isinstance(result, dict) and all(
+            f"\n{marker}" in (result.get("output") or "") for marker in markers
+        )
+        if not complete:
+            # Made-up or unsplit results must not be cached as the commands' output
+            self.invalidate()
+        if isinstance(result, dict) and isinstance(result.get("output"), str):
+            outputs = _split(result["output"], markers)
+            errors = _split(result.get("error") or "", markers)
+            results = [
+                {**result, "output": output, "error": error or ""}
+                for output, error in zip(outputs, errors)
+            ]
+            for i, output in enumerate(outputs):
+                if output is None:
+                    # An earlier command stopped the script (e.g. `exit`)
+                    results[i] = {
+                        **result,
+                        "output": "",
+                        "error": "Not run, the shell stopped before this command",
+                    }
+        else:
+            results = [result] * len(group)  # Cannot be split, everyone sees it all
+
+        for (_, future), command_result in zip(group, results):
+            if not future.done():
+                future.set_result(command_result)
+
+
+def _split(text: str, markers: List[str]) -> List[Optional[str]]:
+    """Split a batched script's output at each command's end marker.
+
+    A command whose marker is missing gets the rest of the output, later commands None.
+    """
+    parts: List[Optional[str]] = []
+    position = 0
+    for marker in markers:
+        if position is None:
+            parts.append(None)
+            continue
+        end = text.find(f"\n{marker}", position)
+        if end == -1:
+            parts.append(text[position:])
+            position = None
+            continue
+        parts.append(text[position:end])
+        position = end + len(marker) + 1
+        if text.startswith("\n", position):
+            position += 1
+    return parts
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import sys
+import time
+from abc import ABC, abstractmethod
+from logging.handlers import RotatingFileHandler
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from scrapybara.types.act import Step
+
+from .util import pretty_print_step
+
+
+class StepRecord(NamedTuple):
+    """A step as handed to a sink"""
+
+    time: float
+    agent_name: str
+    color: Tuple[int, int, int]
+    step: Step
+
+
+class StepSink(ABC):
+    """Base class for step output, kept off the agents' critical path.
+
+    `publish` only enqueues the step. A background task drains the queue and hands
+    everything that accumulated to `write` in one batch, on a worker thread, so slow
+    terminals or disks never stall an act loop. Agents only wait once `max_queued`
+    steps are pending. `submit` does the same from synchronous code, and outside an
+    event loop writes the step right away. Subclasses implement `write`.
+
+    Args:
+        max_queued (int): Maximum number of steps waiting to be written
+        batch_size (int): Maximum number of steps passed to a single `write`
+    """
+
+    def __init__(self, max_queued: int = 1024, batch_size: int = 64):
+        self.max_queued = max_queued
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._drain: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @abstractmethod
+    def write(self, records: List[StepRecord]) -> None:
+        """Write a batch of steps"""
+
+    def _start(self) -> asyncio.Queue:
+        # A sink can outlive an event loop (e.g. a module-level sink used across
+        # several asyncio.run calls), so the queue and drain task are per loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._drain is None or self._drain.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._drain = loop.create_task(self._run())
+        return self._queue
+
+    async def publish(self, agent_name: str, color: Any, step: Step) -> None:
+        """Queue a step for writing, waiting only if the queue is full"""
+        waiter = self.submit(agent_name, color, step)
+        if waiter is not None:
+            await waiter
+
+    def submit(self, agent_name: str, color: Any, step: Step) -> Optional[asyncio.Task]:
+        """Queue a step for writing without waiting.
+
+        Returns:
+            Optional[asyncio.Task]: None once the step is queued (or written, when no
+                event loop is running). If the queue is full, a task that queues the
+                step as soon as there is room, which callers may await for backpressure
+        """
+        record = StepRecord(time.time(), agent_name, color, step)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.write([record])
+            return None
+        queue = self._start()
+        try:
+            queue.put_nowait(record)
+        except asyncio.QueueFull:
+            return asyncio.create_task(queue.put(record))
+        return None
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self.write, batch)
+            except Exception as e:
+                print(f"Error writing steps to {type(self).__name__}: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def flush(self) -> None:
+        """Wait until every published step has been written"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush and stop the background task"""
+        await self.flush()
+        if self._drain is not None and not self._drain.done():
+            self._drain.cancel()
+        self._drain = None
+
+
+class NullSink(StepSink):
+    """Discards steps without queuing them, for headless runs"""
+
+    def submit(self, agent_name: str, color: Any, step: Step) -> Optional[asyncio.Task]:
+        return None
+
+    def write(self, records: List[StepRecord]) -> None:
+        return None
+
+
+class ConsoleSink(StepSink):
+    """Prints steps with colored output, one flush of stdout per batch"""
+
+    def write(self, records: List[StepRecord]) -> None:
+        for record in records:
+            pretty_print_step(record.step, record.agent_name, record.color)
+        sys.stdout.flush()
+
+
+def _step_json(step: Step, include_images: bool) -> dict:
+    data = step.model_dump(mode="json", exclude_none=True)
+    if not include_images:
+        for result in data.get("tool_results") or []:
+            if isinstance(result.get("result"), dict) and result["result"].get(
+                "base64_image"
+            ):
+                result["result"]["base64_image"] = ""
+    return data
+
+
+class JSONLSink(StepSink):
+    """Appends one JSON object per step to a file
+
+    Args:
+        path (str): File to append to
+        include_images (bool): Whether to keep screenshots (base64) in tool results
+        **kwargs: Queue options, see StepSink
+    """
+
+    def __init__(self, path: str, include_images: bool = False, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = path
+        self.include_images = include_images
+
+    def write(self, records: List[StepRecord]) -> None:
+        lines = [
+            json.dumps(
+                {
+                    "time": record.time,
+                    "agent": record.agent_name,
+                    "step": _step_json(record.step, self.include_images),
+                }
+            )
+            for record in records
+        ]
+        with open(self.path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+class RotatingLogSink(StepSink):
+    """Writes a line per step text and tool call to a size-rotated log file
+
+    Args:
+        path (str): Log file, rotated to path.1, path.2, ... once it grows too large
+        max_bytes (int): Size at which the log is rotated
+        backup_count (int): Number of rotated files to keep
+        **kwargs: Queue options, see StepSink
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 10_000_000,
+        backup_count: int = 5,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self._handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, delay=True
+        )
+        self._handler.setFormatter(
+            logging.Formatter("%(asctime)s %(name)s: %(message)s")
+        )
+
+    def _emit(self, record: StepRecord, message: str) -> None:
+        self._handler.emit(
+            logging.makeLogRecord(
+                {"name": record.agent_name, "msg": message, "created": record.time}
+            )
+        )
+
+    def write(self, records: List[StepRecord]) -> None:
+        for record in records:
+            if record.step.text:
+                self._emit(record, record.step.text)
+            for call in record.step.tool_calls or []:
+                self._emit(record, f"{call.tool_name}({json.dumps(call.args)[1:-1]})")
+        self._handler.flush()
+
+    async def close(self) -> None:
+        await super().close()
+        self._handler.close()
+
+
+console_sink = ConsoleSink()  # Shared default, so agents' output is not interleaved
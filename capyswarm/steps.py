@@ -0,0 +1,132 @@
+import mmap
+from array import array
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+from scrapybara.types.act import Step
+
+
+class StepStore:
+    """An agent's steps, with bounded memory.
+
+    The newest `max_in_memory` steps are kept in a ring buffer. With a `log_path`, every
+    step is also appended to a log file (one JSON object per line), and older steps are
+    read back from it through a memory map when asked for. Without one, older steps are
+    dropped. Steps keep their index, so `len` counts every step ever appended. An
+    existing log file is appended to, its previous contents are not read.
+
+    It works like a list of the steps that can still be read: it can be indexed,
+    sliced, iterated, appended and extended, and a model holding one dumps it as a list.
+
+    Args:
+        max_in_memory (int): Number of most recent steps kept in memory
+        log_path (Optional[str]): Append-only file that keeps every step
+        steps (Iterable[Step]): Initial steps
+    """
+
+    def __init__(
+        self,
+        max_in_memory: int = 200,
+        log_path: Optional[str] = None,
+        steps: Iterable[Step] = (),
+    ):
+        self.max_in_memory = max_in_memory
+        self.log_path = log_path
+        self._recent: deque = deque(maxlen=max_in_memory)
+        self._total = 0
+        self._offsets = array("Q")  # Byte offset of each step's line in the log
+        self._log = None
+        self._map: Optional[mmap.mmap] = None
+        if log_path:
+            self._log = open(log_path, "ab+")
+        for step in steps:
+            self.append(step)
+
+    def __len__(self) -> int:
+        return self._total
+
+    @property
+    def first_index(self) -> int:
+        """Index of the oldest step that can still be read"""
+        return 0 if self._log else self._total - len(self._recent)
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        # Validates from a list of steps (or None), dumps as the steps still readable
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                list,
+                return_schema=core_schema.list_schema(handler.generate_schema(Step)),
+            ),
+        )
+
+    @classmethod
+    def _validate(cls, value: Any) -> "StepStore":
+        if isinstance(value, StepStore):
+            return value
+        return cls(steps=(Step.model_validate(step) for step in value or ()))
+
+    def append(self, step: Step) -> None:
+        if self._log:
+            self._offsets.append(self._log.tell())
+            self._log.write(step.model_dump_json(exclude_none=True).encode() + b"\n")
+        self._recent.append(step)
+        self._total += 1
+
+    def _read(self, index: int) -> Step:
+        end = self._offsets[index + 1] if index + 1 < self._total else None
+        if self._map is None or (end or self._log.tell()) > len(self._map):
+            # The log grew since it was mapped
+            self._log.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._log.fileno(), 0, access=mmap.ACCESS_READ)
+        return Step.model_validate_json(self._map[self._offsets[index] : end])
+
+    def extend(self, steps: Iterable[Step]) -> None:
+        for step in steps:
+            self.append(step)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Step, List[Step]]:
+        if isinstance(index, slice):
+            # Like a list, steps that are out of range (or no longer readable) are left out
+            start, stop, stride = index.indices(self._total)
+            indices = range(start, stop, stride)
+            return [self[i] for i in indices if i >= self.first_index]
+        if index < 0:
+            index += self._total
+        if not self.first_index <= index < self._total:
+            raise IndexError(f"Step {index} is not available")
+        memory_start = self._total - len(self._recent)
+        if index >= memory_start:
+            return self._recent[index - memory_start]
+        return self._read(index)
+
+    def items(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, Step]]:
+        """Iterate over (index, step) pairs between `start` and `stop`, oldest first"""
+        stop = self._total if stop is None else min(stop, self._total)
+        for index in range(max(start, self.first_index), stop):
+            yield index, self[index]
+
+    def __iter__(self) -> Iterator[Step]:
+        return (step for _, step in self.items())
+
+    def rewrite(self, update: Callable[[List[Step]], List[Step]]) -> None:
+        """Replace the steps held in memory, e.g. to drop images. The log is not changed."""
+        self._recent = deque(update(list(self._recent)), maxlen=self.max_in_memory)
+
+    def close(self) -> None:
+        """Close the log file, only the steps held in memory remain readable"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._log:
+            self._log.close()
+            self._log = None
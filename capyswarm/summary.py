@@ -0,0 +1,41 @@
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+from scrapybara.types.act import Step
+
+
+class AgentSummary(BaseModel):
+    """A rolling summary of an agent's work, updated incrementally as steps arrive.
+
+    Attributes:
+        steps (int): Number of steps taken so far
+        tool_calls (Dict[str, int]): Number of calls per tool
+        errors (int): Number of tool calls that failed
+        recent (List[str]): Text of the most recent steps, newest last
+        max_recent (int): Number of recent step texts to keep
+    """
+
+    steps: int = 0
+    tool_calls: Dict[str, int] = Field(default_factory=dict)
+    errors: int = 0
+    recent: List[str] = Field(default_factory=list)
+    max_recent: int = 3
+
+    def update(self, step: Step) -> None:
+        """Fold a new step into the summary"""
+        self.steps += 1
+        for call in step.tool_calls or []:
+            self.tool_calls[call.tool_name] = self.tool_calls.get(call.tool_name, 0) + 1
+        self.errors += sum(1 for r in step.tool_results or [] if r.is_error)
+        if step.text:
+            self.recent = (self.recent + [step.text[:300]])[-self.max_recent :]
+
+    def render(self) -> str:
+        """Render the summary as a few lines of text"""
+        calls = ", ".join(f"{name} x{count}" for name, count in self.tool_calls.items())
+        lines = [
+            f"{self.steps} steps, {self.errors} failed tool calls",
+            f"Tool calls: {calls or 'none'}",
+        ]
+        lines += [f"Recent: {text}" for text in self.recent]
+        return "\n".join(lines)
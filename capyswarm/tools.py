@@ -1,12 +1,64 @@
 import asyncio
+import json
+from abc import abstractmethod
+from collections import deque
 from pydantic import BaseModel, Field
-from typing import Any, List, Optional, Tuple, Sequence
-from scrapybara.tools import Tool
+from typing import Any, Dict, List, Optional, Tuple, Sequence
+from scrapybara.types.tool import Tool  # scrapybara.tools would load playwright
 from scrapybara.client import UbuntuInstance
 from scrapybara.instance.types import Action, Command
-from scrapybara.types.act import UserMessage, TextPart
+from scrapybara.types.act import Step
 from scrapybara.client import AsyncBaseInstance, AsyncUbuntuInstance
 
+from .files import FileViewCache
+from .screenshots import ScreenshotThrottle
+from .shell import BashRunner
+
+READ_ONLY_ACTIONS = {
+    "screenshot",
+    "cursor_position",
+}  # Computer actions that change nothing
+
+
+class AsyncTool(Tool):
+    """A tool whose work is a coroutine on the swarm's event loop.
+
+    The swarm's agent loop awaits `acall` directly, so a remote call never holds an OS
+    thread. Calling the tool synchronously (e.g. from `AsyncScrapybara.act`) still works:
+    from another thread it schedules `acall` on the loop the tool was created on and
+    waits for it, and where no loop is running it runs `acall` to completion itself.
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop]
+
+    def __init__(self, **data: Any) -> None:
+        super().__init__(**data)
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+    def __call__(self, **kwargs: Any) -> Any:
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        loop = self._loop
+        if loop is not None and loop.is_running() and loop is not current:
+            future = asyncio.run_coroutine_threadsafe(self.acall(**kwargs), loop)
+            return future.result()
+        if current is not None:
+            # Blocking here would stop the loop that has to run `acall`
+            raise RuntimeError(
+                f"Tool {self.name} was called synchronously on a running event loop, "
+                "await its acall method instead"
+            )
+        return asyncio.run(self.acall(**kwargs))
+
+    @abstractmethod
+    async def acall(self, **kwargs: Any) -> Any:
+        """Execute the tool with the given arguments"""
+
 
 class OrchestratorSchema(BaseModel):
     """The orchestrator's structured plan for task distribution"""
@@ -15,6 +67,10 @@ class OrchestratorSchema(BaseModel):
         agent_name: str
         prompt: str
         priority: int = 1  # Higher number = higher priority
+        task_id: Optional[str] = None  # Unique ID other assignments can depend on
+        depends_on: Optional[List[str]] = (
+            None  # IDs of tasks that must finish first, None = use priority ordering
+        )
 
     overall_task: str  # The original task being broken down
     task_assignments: List[TaskAssignment]  # List of assignments for each agent
@@ -25,15 +81,55 @@ class InspectAgentParameters(BaseModel):
     """Parameters for inspecting an agent's work"""
 
     agent_name: str  # Name of the agent to inspect
+    last_n: Optional[int] = Field(
+        None, description="Only consider the agent's last N steps"
+    )
+    query: Optional[str] = Field(
+        None,
+        description="Only return steps whose text, tool calls or results contain this keyword (case-insensitive)",
+    )
+    tool_name: Optional[str] = Field(
+        None, description="Only return steps that called this tool"
+    )
+    cursor: Optional[int] = Field(
+        None,
+        description="Return steps before this step index, use next_cursor from a previous call to page back",
+    )
+    page_size: int = Field(5, description="Maximum number of steps to return")
+
 
+def _truncate(value: Any, limit: int = 500) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return text if len(text) <= limit else text[:limit] + "... [truncated]"
 
-class InspectAgentTool(Tool):
+
+def _step_view(index: int, step: Step) -> Dict[str, Any]:
+    """A compact, image-free view of a step for the orchestrator"""
+    results = []
+    for r in step.tool_results or []:
+        result = r.result
+        if isinstance(result, dict) and result.get("base64_image"):
+            result = {k: v for k, v in result.items() if k != "base64_image"}
+        results.append(
+            {"tool": r.tool_name, "result": _truncate(result), "is_error": r.is_error}
+        )
+    return {
+        "index": index,
+        "text": _truncate(step.text),
+        "tool_calls": [
+            {"tool": c.tool_name, "args": _truncate(c.args, 200)}
+            for c in step.tool_calls or []
+        ],
+        "tool_results": results,
+    }
+
+
+class InspectAgentTool(AsyncTool):
     """Tool for orchestrator to inspect an agent's work history"""
 
     _instance: UbuntuInstance
     _agent: Any  # Reference to the orchestrator
     _swarm: Any  # Reference to the swarm instance
-    _loop: asyncio.AbstractEventLoop
 
     def __init__(self, instance: UbuntuInstance, agent: Any, swarm: Any) -> None:
         if not agent.orchestrator:
@@ -41,21 +137,14 @@ class InspectAgentTool(Tool):
 
         super().__init__(
             name="inspect_agent",
-            description="Check an agent's work history to see what they've done or find specific information.",
+            description="Check an agent's work history to see what they've done or find specific information. Returns a summary and a page of matching steps, newest last.",
             parameters=InspectAgentParameters,
         )
         self._instance = instance
         self._agent = agent
         self._swarm = swarm
-        self._loop = asyncio.get_running_loop()
 
-    def __call__(self, **kwargs: Any) -> Any:
-        future = asyncio.run_coroutine_threadsafe(
-            self._async_call(**kwargs), self._loop
-        )
-        return future.result()
-
-    async def _async_call(self, **kwargs: Any) -> Any:
+    async def acall(self, **kwargs: Any) -> Any:
         params = InspectAgentParameters(**kwargs)
 
         # Find the target agent
@@ -66,19 +155,40 @@ class InspectAgentTool(Tool):
         if not target_agent:
             raise ValueError(f"Agent {params.agent_name} not found")
 
-        # Get agent's work history
-        history = {
+        # Steps are streamed from the agent's store, only a page is held at a time
+        store = target_agent.steps
+        total = len(store)
+        start = 0 if params.last_n is None else total - params.last_n
+        steps = store.items(start, params.cursor)
+        if params.tool_name:
+            steps = (
+                (i, step)
+                for i, step in steps
+                if any(c.tool_name == params.tool_name for c in step.tool_calls or [])
+            )
+        if params.query:
+            query = params.query.lower()
+            steps = (
+                (i, step)
+                for i, step in steps
+                if query in step.model_dump_json(exclude_none=True).lower()
+            )
+
+        # Newest matching steps first in the page, returned in chronological order
+        page = deque(maxlen=max(params.page_size, 0) + 1)
+        page.extend(steps)
+        more = len(page) > params.page_size
+        page = list(page)[1:] if more else list(page)
+
+        return {
             "agent_name": target_agent.name,
             "current_prompt": target_agent.prompt,
-            "messages": [
-                {"role": msg.role, "content": msg.content}
-                for msg in target_agent.messages
-            ],
-            "steps": target_agent.steps if target_agent.steps else None,
+            "summary": target_agent.summary.render(),
+            "total_steps": total,
+            "steps": [_step_view(i, step) for i, step in page],
+            "next_cursor": page[0][0] if page and more else None,
         }
 
-        return history
-
 
 class CommunicateParameters(BaseModel):
     """Parameters for agent communication"""
@@ -86,13 +196,12 @@ class CommunicateParameters(BaseModel):
     message: str  # The message content
 
 
-class CommunicateTool(Tool):
+class CommunicateTool(AsyncTool):
     """Tool for agents to communicate with the orchestrator"""
 
     _instance: UbuntuInstance
     _agent: Any  # Reference to the current agent
     _swarm: Any  # Reference to the swarm instance
-    _loop: asyncio.AbstractEventLoop
 
     def __init__(self, instance: UbuntuInstance, agent: Any, swarm: Any) -> None:
         if agent.orchestrator:
@@ -108,46 +217,22 @@ class CommunicateTool(Tool):
         self._instance = instance
         self._agent = agent
         self._swarm = swarm
-        self._loop = asyncio.get_running_loop()
 
-    def __call__(self, **kwargs: Any) -> Any:
-        future = asyncio.run_coroutine_threadsafe(
-            self._async_call(**kwargs), self._loop
-        )
-        return future.result()
-
-    async def _async_call(self, **kwargs: Any) -> Any:
+    async def acall(self, **kwargs: Any) -> Any:
         params = CommunicateParameters(**kwargs)
 
         # Validate message content
         if not params.message or not params.message.strip():
             raise ValueError("Message content cannot be empty")
 
-        # Create message for orchestrator as a user message
-        agent_message = UserMessage(
-            content=[
-                TextPart(type="text", text=f"[{self._agent.name}] {params.message}")
-            ]
-        )
-
-        self._swarm.orchestrator.messages.append(agent_message)
-
-        # Temporarily remove orchestrator's on_step function so orchestrator's response is not printed before the agent's message
-        original_on_step = self._swarm.orchestrator.on_step
-        self._swarm.orchestrator.on_step = None
-
-        response = await self._swarm.run_agent_task(self._swarm.orchestrator)
-
-        self._swarm.orchestrator.on_step = original_on_step
-
-        if not response:
-            raise ValueError("Failed to get response from orchestrator")
+        # Batched with other agents' messages into a single orchestrator turn
+        _, steps = await self._swarm.mailbox.send(self._agent, params.message)
 
         return {
             "from_agent": self._agent.name,
             "to_agent": "Orchestrator",
             "message": params.message,
-            "orchestrator_response": response.steps,
+            "orchestrator_response": steps,
             "orchestrator_response_color": self._swarm.orchestrator.color,
         }
 
@@ -157,29 +242,30 @@ class AsyncBashToolParameters(BaseModel):
     restart: Optional[bool] = Field(False, description="Whether to restart the shell")
 
 
-class AsyncBashTool(Tool):
+class AsyncBashTool(AsyncTool):
     _instance: AsyncUbuntuInstance
-    _loop: asyncio.AbstractEventLoop
+    _runner: Optional[BashRunner]
 
-    def __init__(self, instance: AsyncUbuntuInstance) -> None:
+    def __init__(
+        self, instance: AsyncUbuntuInstance, runner: Optional[BashRunner] = None
+    ) -> None:
         super().__init__(
             name="bash",
             description="Execute bash commands in the shell",
             parameters=AsyncBashToolParameters,
         )
         self._instance = instance
-        # Save the current (main) event loop for later use.
-        self._loop = asyncio.get_running_loop()
+        self._runner = runner  # Batches and caches commands, shared per instance
 
-    def __call__(self, **kwargs: Any) -> Any:
-        # Schedule the asynchronous call on the stored (main) event loop.
-        future = asyncio.run_coroutine_threadsafe(
-            self._async_call(**kwargs), self._loop
-        )
-        return future.result()
+    @property
+    def batched(self) -> bool:
+        """Whether consecutive calls can be issued together and pipelined"""
+        return self._runner is not None and self._runner.batched
 
-    async def _async_call(self, **kwargs: Any) -> Any:
+    async def acall(self, **kwargs: Any) -> Any:
         params = AsyncBashToolParameters.model_validate(kwargs)
+        if self._runner is not None:
+            return await self._runner.run(params.command, params.restart)
         result = await self._instance.bash(
             command=params.command, restart=params.restart
         )
@@ -196,32 +282,48 @@ class AsyncComputerToolParameters(BaseModel):
     text: Optional[str] = Field(None, description="Text for keyboard actions")
 
 
-class AsyncComputerTool(Tool):
+class AsyncComputerTool(AsyncTool):
     _instance: AsyncBaseInstance
-    _loop: asyncio.AbstractEventLoop
-
-    def __init__(self, instance: AsyncBaseInstance) -> None:
+    _throttle: Optional[ScreenshotThrottle]
+    _runner: Optional[BashRunner]
+
+    def __init__(
+        self,
+        instance: AsyncBaseInstance,
+        throttle: Optional[ScreenshotThrottle] = None,
+        runner: Optional[BashRunner] = None,
+    ) -> None:
         super().__init__(
             name="computer",
             description="Control mouse and keyboard for computer interaction",
             parameters=AsyncComputerToolParameters,
         )
         self._instance = instance
-        self._loop = asyncio.get_running_loop()
-
-    def __call__(self, **kwargs: Any) -> Any:
-        future = asyncio.run_coroutine_threadsafe(
-            self._async_call(**kwargs), self._loop
-        )
-        return future.result()
+        self._throttle = throttle  # The agent's screenshot throttle
+        self._runner = runner  # Its caches are cleared by actions that may change files
 
-    async def _async_call(self, **kwargs: Any) -> Any:
+    async def acall(self, **kwargs: Any) -> Any:
         params = AsyncComputerToolParameters.model_validate(kwargs)
-        result = await self._instance.computer(
-            action=params.action,
-            coordinate=tuple(params.coordinate) if params.coordinate else None,
-            text=params.text,
-        )
+        coordinate = params.coordinate
+        if self._throttle is not None:
+            if params.action == "screenshot":
+                await self._throttle.wait(self._instance.id)
+            coordinate = self._throttle.to_screen(self._instance.id, coordinate)
+        # A click or keystroke in the GUI can save any file
+        changes = self._runner is not None and params.action not in READ_ONLY_ACTIONS
+        if changes:
+            self._runner.forget()
+        try:
+            result = await self._instance.computer(
+                action=params.action,
+                coordinate=tuple(coordinate) if coordinate else None,
+                text=params.text,
+            )
+        finally:
+            if changes:
+                self._runner.forget()
+        if self._throttle is not None:
+            result = self._throttle.process(self._instance.id, result)
         return result
 
 
@@ -245,28 +347,64 @@ class AsyncEditToolParameters(BaseModel):
     )
 
 
-class AsyncEditTool(Tool):
+class AsyncEditTool(AsyncTool):
     _instance: AsyncUbuntuInstance
-    _loop: asyncio.AbstractEventLoop
+    _runner: Optional[BashRunner]
 
-    def __init__(self, instance: AsyncUbuntuInstance) -> None:
+    def __init__(
+        self, instance: AsyncUbuntuInstance, runner: Optional[BashRunner] = None
+    ) -> None:
         super().__init__(
             name="str_replace_editor",
             description="View, create, and edit files in the filesystem",
             parameters=AsyncEditToolParameters,
         )
         self._instance = instance
-        self._loop = asyncio.get_running_loop()
+        self._runner = runner  # Its cached bash results are cleared on every write
 
-    def __call__(self, **kwargs: Any) -> Any:
-        future = asyncio.run_coroutine_threadsafe(
-            self._async_call(**kwargs), self._loop
-        )
-        return future.result()
-
-    async def _async_call(self, **kwargs: Any) -> Any:
+    async def acall(self, **kwargs: Any) -> Any:
         params = AsyncEditToolParameters.model_validate(kwargs)
-        result = await self._instance.edit(
+        files = self._runner.files if self._runner is not None else None
+        if params.command == "view":
+            if files is not None:
+                return await self._view(params, files)
+            return await self._edit(params)
+
+        if self._runner is not None:
+            self._runner.invalidate()
+        generation = files.generation if files is not None else 0
+        try:
+            result = await self._edit(params)
+        except BaseException:
+            if files is not None:
+                files.drop(params.path)
+            raise
+        finally:
+            if self._runner is not None:
+                self._runner.invalidate()
+        if files is not None:
+            files.apply_edit(params, result, generation)
+        return result
+
+    async def _view(self, params: AsyncEditToolParameters, files: FileViewCache) -> Any:
+        """Serve a view from the file cache, fetching the whole file on a miss"""
+        result = files.view(params.path, params.view_range)
+        if result is not None:
+            return result
+        if params.path in files:
+            return await self._edit(params)  # Invalid range, the instance says why
+
+        generation = files.generation
+        full = await self._edit(params.model_copy(update={"view_range": None}))
+        stored = files.store_view(params.path, full, generation)
+        if params.view_range is None:
+            return full
+        if stored and (result := files.render(params.path, params.view_range)):
+            return result
+        return await self._edit(params)
+
+    async def _edit(self, params: AsyncEditToolParameters) -> Any:
+        return await self._instance.edit(
             command=params.command,
             path=params.path,
             file_text=params.file_text,
@@ -275,4 +413,3 @@ class AsyncEditTool(Tool):
             new_str=params.new_str,
             insert_line=params.insert_line,
         )
-        return result
@@ -1,11 +1,19 @@
 from typing import List, Callable, Optional, Any, Tuple, Literal
-from pydantic import BaseModel, Field, model_validator
-from scrapybara.anthropic import Anthropic
-from scrapybara.types.act import Message, Step
-from .util import pretty_print_step
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from scrapybara.types.act import Message, Model
+from .sinks import console_sink
+from .summary import AgentSummary
+from .steps import StepStore
 import random
 
 
+def _default_model() -> Model:
+    # Imported on first use, scrapybara.anthropic loads the whole Anthropic SDK
+    from scrapybara.anthropic import Anthropic
+
+    return Anthropic()
+
+
 class Agent(BaseModel):
     """An AI agent that is part of a swarm, capable of executing tasks and communicating with other agents.
 
@@ -15,14 +23,21 @@ class Agent(BaseModel):
         instance_type (str): The type of instance to use ("ubuntu", "windows", or "browser")
         color (Optional[Tuple[int, int, int]]): RGB color tuple for agent's output (r,g,b)
         orchestrator (bool): Whether this agent is the orchestrator (False for worker agents)
-        model (Anthropic): The LLM model instance used by this agent
+        model (Model): The LLM model used by this agent, Anthropic() by default
         tools (List[Any]): Tools available to this agent (set by Swarm)
         system (str): System prompt defining the agent's role and capabilities
         prompt (Optional[str]): Current task or instruction for the agent
         messages (Optional[List[Message]]): Agent's conversation history
-        steps (Optional[List[Step]]): Store all steps from the agent
+        steps (StepStore): The agent's steps, the most recent kept in memory (a list is converted)
         response_schema (Optional[Any]): Schema for structured output (used by orchestrator)
         on_step (Optional[Callable]): Callback for processing execution steps
+        step_sink (Optional[StepSink]): Where the default on_step writes steps, defaults to the console
+        compactor (Optional[Compactor]): Compacts the history before each act call, e.g. TokenBudgetCompactor
+        image_store (Optional[ImageStore]): Keeps only the newest screenshots inline in messages and steps
+        screenshots (Optional[ScreenshotThrottle]): Leaves out unchanged screenshots, and throttles, crops or downscales them
+        summary (AgentSummary): Rolling summary of the agent's steps, used by inspect_agent
+        timeout (Optional[float]): Seconds an act call may take before it is abandoned
+        max_retries (int): Retries for act requests that fail with a transient error
     """
 
     # Swarm-specific fields
@@ -41,26 +56,71 @@ class Agent(BaseModel):
     orchestrator: bool = False
 
     # client.act parameters
-    model: Anthropic = Field(default_factory=Anthropic)
+    model: Model = Field(default_factory=_default_model)  # e.g. Anthropic()
     tools: List[Any] = Field(default_factory=list)  # List of tool instances
     system: Optional[str] = None
     prompt: Optional[str] = None
     messages: Optional[List[Message]] = None  # Agent's conversation history
-    steps: Optional[List[Step]] = None
+    steps: StepStore = Field(default_factory=StepStore)  # Bounded step history
     response_schema: Optional[Any] = None  # Schema for structured output
     on_step: Optional[Callable] = None
+    step_sink: Optional[Any] = Field(default_factory=lambda: console_sink)
+    compactor: Optional[Any] = None  # Compactor that keeps the history within a budget
+    image_store: Optional[Any] = None  # ImageStore that bounds screenshots in history
+    screenshots: Optional[Any] = None  # ScreenshotThrottle for the computer tool
+    summary: AgentSummary = Field(default_factory=AgentSummary)
+    timeout: Optional[float] = None  # Deadline for each act call, in seconds
+    max_retries: int = 2  # Retries with backoff for rate limits and overloads
+    _default_on_step: bool = PrivateAttr(default=False)
 
     @model_validator(mode="after")
     def setup_defaults(self) -> "Agent":
         """Set up default on_step function"""
         if self.on_step is None:
-
+            # Synchronous, so it also works as an on_step for scrapybara's own `act`.
+            # When the sink is full it returns a task our act loop waits for
             def step_handler(step):
-                pretty_print_step(step, self.name, self.color)
-                if self.steps is None:
-                    self.steps = [step]
-                else:
-                    self.steps.append(step)
+                self.summary.update(step)
+                self.steps.append(step)
+                if self.step_sink:
+                    return self.step_sink.submit(self.name, self.color, step)
 
             self.on_step = step_handler
+            self._default_on_step = True
         return self
+
+    def clone(self) -> "Agent":
+        """Copy the agent's definition without its run state.
+
+        The copy starts with no history, steps, summary or previous screenshots (and its
+        own default step handler), so it can run concurrently with the original.
+        """
+        fields = {
+            name: getattr(self, name)
+            for name in type(self).model_fields
+            if name not in ("messages", "steps", "summary")
+        }
+        fields["tools"] = list(self.tools)
+        if self.screenshots is not None:
+            fields["screenshots"] = self.screenshots.clone()
+        if self._default_on_step:
+            fields.pop("on_step")
+        return Agent(**fields)
+
+
+class TaskResult(BaseModel):
+    """The outcome of one task assignment, reported back to the orchestrator.
+
+    Attributes:
+        task_id (str): ID of the assignment in the orchestrator's plan
+        agent_name (str): The agent the task was assigned to
+        status (str): "completed", "failed", "timed_out" or "cancelled"
+        output (Optional[str]): The agent's final text, if it completed
+        error (Optional[str]): What went wrong, if it did not
+    """
+
+    task_id: str
+    agent_name: str
+    status: Literal["completed", "failed", "timed_out", "cancelled"]
+    output: Optional[str] = None
+    error: Optional[str] = None
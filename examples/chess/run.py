@@ -9,7 +9,9 @@ load_dotenv()
 
 async def main():
     async with Swarm(
-        [white, black, orchestrator], api_key=os.getenv("SCRAPYBARA_API_KEY")
+        [white, black, orchestrator],
+        api_key=os.getenv("SCRAPYBARA_API_KEY"),
+        detach_adopted=True,  # keep the chess instance running between games
     ) as swarm:
         await swarm.run(
             prompt="""